@@ -54,16 +54,62 @@ file: _typing.Optional[_pathlib.Path] = None
 testPath: _typing.Optional[_pathlib.Path] = None
 
 class _Context:
-    def __init__(self, debug=False, json=False, silent=False, outputLimit=1000):
+    def __init__(
+            self,
+            debug=False,
+            json=False,
+            silent=False,
+            outputLimit=1000,
+            startMethod="spawn",
+            memoryLimit=None,
+            cpuLimit=None,
+            openFilesLimit=None,
+            stdoutLimit=None,
+            captureLimit=None,
+            cache=False,
+            refreshCache=False,
+            incremental=False
+        ):
         self.debug = debug
         self.json = json
         self.silent = silent
         self.outputLimit = outputLimit
+        self.startMethod = startMethod
+
+        # Resource limits of each tester process, None means unlimited
+        self.memoryLimit = memoryLimit # megabytes of address space
+        self.cpuLimit = cpuLimit # seconds of cpu time
+        self.openFilesLimit = openFilesLimit # number of open file descriptors
+        self.stdoutLimit = stdoutLimit # characters printed per test
+
+        # Characters kept of the output captured for outputOf() and alike, the first and last half only, None keeps all
+        self.captureLimit = captureLimit
+
+        # Reuse results of earlier runs for unchanged files and tests, see checkpy.tester.resultcache
+        self.cache = cache
+        self.refreshCache = refreshCache # run anyway and overwrite the cached result
+
+        # Only rerun tests that use changed code, see checkpy.incremental
+        self.incremental = incremental
 
     def __reduce__(self):
         return (
             _Context,
-            (self.debug, self.json, self.silent, self.outputLimit)
+            (
+                self.debug,
+                self.json,
+                self.silent,
+                self.outputLimit,
+                self.startMethod,
+                self.memoryLimit,
+                self.cpuLimit,
+                self.openFilesLimit,
+                self.stdoutLimit,
+                self.captureLimit,
+                self.cache,
+                self.refreshCache,
+                self.incremental
+            )
         )
 
 context = _Context()
\ No newline at end of file
@@ -5,8 +5,12 @@ from checkpy import context
 from checkpy import downloader
 from checkpy import tester
 from checkpy import printer
+from checkpy import interactive
 from checkpy.tester import TesterResult
+from checkpy.tester import discovery
+from checkpy.tester import resultcache
 import json
+import signal
 import importlib.metadata
 import warnings
 
@@ -32,8 +36,24 @@ def main():
     parser.add_argument("--dev", action="store_true", help="get extra information to support the development of tests")
     parser.add_argument("--silent", action="store_true", help="do not print test results to stdout")
     parser.add_argument("--json", action="store_true", help="return output as json, implies silent")
+    parser.add_argument("--ndjson", action="store_true", help="stream output as json, one line per tested file as soon as it is tested, implies silent")
     parser.add_argument("--gh-auth", action="store", help="username:personal_access_token for authentication with GitHub.")
     parser.add_argument("--output-limit", action="store", type=int, default=1000, dest="outputLimit", help="limit the number of characters stored for each test's output field. Default is 1000. Set to 0 to disable this limit.")
+    parser.add_argument("--memory-limit", action="store", type=int, default=None, dest="memoryLimit", help="limit the memory (address space) of the process running the tests to this number of megabytes.")
+    parser.add_argument("--cpu-limit", action="store", type=int, default=None, dest="cpuLimit", help="limit the cpu time of the process running the tests to this number of seconds.")
+    parser.add_argument("--open-files-limit", action="store", type=int, default=None, dest="openFilesLimit", help="limit the number of files the process running the tests can have open.")
+    parser.add_argument("--stdout-limit", action="store", type=int, default=None, dest="stdoutLimit", help="fail a test once the tested code prints more than this number of characters.")
+    parser.add_argument("--capture-limit", action="store", type=int, default=None, dest="captureLimit", help="keep only the first and last part, about this number of characters, of what the tested code prints. Tests then see a truncated output, in exchange the memory used no longer grows with the output.")
+    parser.add_argument("--start-method", action="store", choices=["spawn", "forkserver"], default="spawn", dest="startMethod", help="how to start the process that runs the tests. forkserver forks each test run from a process that has checkpy and the libraries used by the tests imported already. Default is spawn.")
+    parser.add_argument("-j", "--jobs", action="store", type=int, default=None, dest="jobs", help="number of files (or exercises of a module) to test at the same time. Default is 1, or the number of CPUs with --batch.")
+    parser.add_argument("--batch", action="store", dest="submissions", help="a glob of submission directories, for instance \"submissions/*\". Test the given file in each of them and print one json result per line.")
+    parser.add_argument("--cache", action="store_true", help="reuse the result of an earlier run with --cache if neither the tested file nor its tests changed since. Results are stored in {}.".format(resultcache._CACHEPATH))
+    parser.add_argument("--refresh-cache", action="store_true", dest="refreshCache", help="run all tests even if a result is cached, and store the new results in the cache. Implies --cache.")
+    parser.add_argument("--prune-cache", action="store", type=float, default=None, dest="pruneCache", metavar="DAYS", help="remove all cached results that were not used in the last DAYS days and exit. 0 empties the cache.")
+    parser.add_argument("--incremental", action="store_true", help="only rerun the tests that use code that changed since the last run with --incremental, reuse the results of the other tests.")
+    parser.add_argument("--watch", action="store_true", help="keep testing the given files every time they (or the files next to them) change, until interrupted with ctrl+c.")
+    parser.add_argument("--serve", action="store", dest="serve", metavar="ADDRESS", help="run a grading server on the Unix socket ADDRESS (or on host:port) until drained or interrupted. Tests each submission it is sent on a pool of --jobs testers, see checkpy/tester/server.py for the api.")
+    parser.add_argument("--max-queued", action="store", type=int, default=None, dest="maxQueued", help="with --serve, refuse new submissions (with status 503) once this number of submissions waits for a tester. Default is 100.")
     parser.add_argument("files", action="store", nargs="*", help="names of files to be tested")
     args = parser.parse_args()
 
@@ -42,6 +62,15 @@ def main():
         sys.path.append(rootPath)
 
     context.outputLimit = args.outputLimit
+    context.startMethod = args.startMethod
+    context.memoryLimit = args.memoryLimit
+    context.cpuLimit = args.cpuLimit
+    context.openFilesLimit = args.openFilesLimit
+    context.stdoutLimit = args.stdoutLimit
+    context.captureLimit = args.captureLimit
+    context.cache = args.cache or args.refreshCache
+    context.refreshCache = args.refreshCache
+    context.incremental = args.incremental
 
     if args.gh_auth:
         split_auth = args.gh_auth.split(":")
@@ -72,7 +101,12 @@ def main():
         downloader.clean()
         return
 
-    if args.json:
+    if args.pruneCache is not None:
+        nRemoved = resultcache.prune(maxAge=args.pruneCache * 24 * 60 * 60)
+        print("Removed {} cached result{}".format(nRemoved, "" if nRemoved == 1 else "s"))
+        return
+
+    if args.json or args.ndjson:
         args.silent = True
         context.silent = True
         context.json = True
@@ -80,16 +114,50 @@ def main():
     if args.dev:
         context.debug = True
 
+    if args.submissions:
+        if len(args.files) != 1:
+            printer.displayError("--batch requires exactly one file name to test, for instance: checkpy --batch \"submissions/*\" hello.py")
+            return
+
+        for submission, result in interactive.testBatch(args.files[0], args.submissions, module=args.module or "", jobs=args.jobs, debugMode=args.dev):
+            print(json.dumps({"submission": str(submission), **result.asDict()}), flush=True)
+        return
+
+    if args.serve:
+        from checkpy.tester.server import GradingServer
+
+        downloader.updateSilently()
+        if args.maxQueued is None:
+            server = GradingServer(args.serve, jobs=args.jobs)
+        else:
+            server = GradingServer(args.serve, jobs=args.jobs, maxQueued=args.maxQueued)
+        signal.signal(signal.SIGTERM, lambda signum, frame: server.drain())
+        print("Serving on {}".format(server.address), flush=True)
+        server.serveForever()
+        return
+
+    if args.watch:
+        if not args.files:
+            printer.displayError("--watch requires the names of the files to test, for instance: checkpy --watch hello.py")
+            return
+
+        downloader.updateSilently()
+        try:
+            for _ in tester.watch(args.files, module=args.module or ""):
+                pass
+        except KeyboardInterrupt:
+            pass
+        return
+
     if args.files:
         downloader.updateSilently()
 
-        results: list[TesterResult] = []
-        for f in args.files:
-            if args.module:
-                result = tester.test(f, module=args.module)
-            else:
-                result = tester.test(f)
-            results.append(result)
+        if args.ndjson:
+            for result in tester.testFiles(args.files, module=args.module or "", jobs=args.jobs or 1, ordered=False):
+                print(json.dumps(result.asDict()), flush=True)
+            return
+
+        results: list[TesterResult] = list(tester.testFiles(args.files, module=args.module or "", jobs=args.jobs or 1))
 
         if args.json:
             print(json.dumps([r.asDict() for r in results], indent=4))
@@ -97,7 +165,14 @@ def main():
 
     if args.module:
         downloader.updateSilently()
-        moduleResults = tester.testModule(args.module)
+
+        if args.ndjson:
+            testNames = discovery.getTestNames(args.module) or []
+            for result in tester.testFiles(testNames, module=args.module, jobs=args.jobs or 1, ordered=False):
+                print(json.dumps(result.asDict()), flush=True)
+            return
+
+        moduleResults = tester.testModule(args.module, jobs=args.jobs or 1)
 
         if args.json:
             if moduleResults is None:
@@ -1,23 +1,54 @@
 import sys
+from collections import OrderedDict
 from functools import wraps
+from typing import Any, Callable, Dict, Hashable, List, Optional
 
-_caches = []
+_caches: List["_Cache"] = []
 
-class _Cache(dict):
-    """A dict() subclass that appends a self-reference to _caches"""
-    def __init__(self, *args, **kwargs):
+class _Cache(OrderedDict):
+    """
+    An OrderedDict subclass that appends a self-reference to _caches.
+    Keeps track of hits and misses, and evicts the least recently used entry once it holds more than maxSize entries.
+    """
+    def __init__(self, *args, maxSize: Optional[int]=None, **kwargs):
         super(_Cache, self).__init__(*args, **kwargs)
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
         _caches.append(self)
 
+    def lookup(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Get the value of key, or compute() and store it if key is not in the cache."""
+        if key in self:
+            self.hits += 1
+            self.move_to_end(key)
+            return self[key]
+
+        self.misses += 1
+        value = compute()
+        self[key] = value
+        if self.maxSize is not None and len(self) > self.maxSize:
+            self.popitem(last=False)
+        return value
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self), "maxSize": self.maxSize}
+
+    def clear(self):
+        super(_Cache, self).clear()
+        self.hits = 0
+        self.misses = 0
+
 _testCache = _Cache()
 
 
-def cache(*keys):
+def cache(*keys, maxSize: Optional[int]=None):
     """cache decorator
 
     Caches input and output of a function. If arguments are passed to
     the decorator, take those as key for the cache. Otherwise use the
-    function arguments and sys.argv as key.
+    function arguments and sys.argv as key. If maxSize is given, only the
+    maxSize most recently used results are kept.
 
     sys.argv is used here because of user-written code like this:
 
@@ -28,25 +59,46 @@ def cache(*keys):
 
     Depending on the state of sys.argv during execution of the module,
     the outcome of my_function() changes.
+
+    The cache of the decorated function is available as its .cache attribute,
+    for instance to clear() it or to inspect its stats().
     """
     def cacheWrapper(func):
-        localCache = _Cache()
+        localCache = _Cache(maxSize=maxSize)
 
         @wraps(func)
         def cachedFuncWrapper(*args, **kwargs):
             if keys:
-                key = str(keys)
+                key = _makeKey(keys)
             else:
-                key = str(args) + str(kwargs) + str(sys.argv)
-            if key not in localCache:
-                localCache[key] = func(*args, **kwargs)
+                key = (_makeKey(args), _makeKey(sorted(kwargs.items())), tuple(sys.argv))
+            return localCache.lookup(key, lambda: func(*args, **kwargs))
 
-            return localCache[key]
+        cachedFuncWrapper.cache = localCache # type: ignore [attr-defined]
         return cachedFuncWrapper
 
     return cacheWrapper
 
 
+def _makeKey(obj: Any) -> Hashable:
+    """
+    Turn obj into a hashable key, that is only equal for equal objects of the same type (1, 1.0 and True differ).
+    Lists, tuples, dicts and sets are walked, anything else that is not hashable is keyed by its repr.
+    """
+    if isinstance(obj, (list, tuple)):
+        return (type(obj), tuple(_makeKey(o) for o in obj))
+    if isinstance(obj, dict):
+        return (type(obj), tuple((_makeKey(k), _makeKey(v)) for k, v in obj.items()))
+    if isinstance(obj, (set, frozenset)):
+        return (type(obj), frozenset(_makeKey(o) for o in obj))
+
+    try:
+        hash(obj)
+    except TypeError:
+        return (type(obj), repr(obj))
+    return (type(obj), obj)
+
+
 def cacheTestResult(testFunction):
     def wrapper(runFunction):
         @wraps(runFunction)
@@ -62,6 +114,11 @@ def getCachedTestResult(testFunction):
     return _testCache[testFunction.__name__]
 
 
+def setCachedTestResult(testFunction, result):
+    """For a test that did not run, but whose result is known (see checkpy.incremental)."""
+    _testCache[testFunction.__name__] = result
+
+
 def clearAllCaches():
     for cache in _caches:
         cache.clear()
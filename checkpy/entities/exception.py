@@ -49,6 +49,9 @@ class PathError(CheckpyError):
 class TooManyFilesError(CheckpyError):
     pass
 
+class ResourceLimitError(CheckpyError):
+    pass
+
 class MissingRequiredFiles(CheckpyError):
     def __init__(self, missingFiles: _typing.List[str]):
         super().__init__(message=f"Missing the following required file{'s' if len(missingFiles) != 1 else ''}: {', '.join(missingFiles)}")
@@ -0,0 +1,228 @@
+"""
+Incremental regrades (checkpy --incremental): only rerun the tests that use code that changed since the last run.
+
+While a test runs, every definition of the student's code it touches is recorded:
+- <module> if it imports/runs the file (getFunction, outputOf, ...), the top-level code minus the function bodies
+- <source> if it reads the source (getSource, static analysis), that is the entire file
+- the top-level functions and classes it calls (directly or indirectly)
+
+The next run reuses the result of a test if none of the definitions it touched changed,
+and all tests it depends on (passed(), failed()) were reused as well.
+Definitions are compared by their AST, so reused messages may refer to outdated line numbers.
+Anything else a test depends on (other files, randomness) is not tracked.
+"""
+
+import ast
+import contextlib
+import hashlib
+import sys
+import weakref
+
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, Dict, Generator, Iterable, Optional, Set, Tuple, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from checkpy.tests import TestFunction, TestResult
+
+
+__all__ = ["touch", "recording", "replay", "registerCode", "Regrade"]
+
+
+MODULE = "<module>"
+SOURCE = "<source>"
+
+# The fileName and name of the top-level definition of each code object compiled from student code
+_codeIndex: "weakref.WeakKeyDictionary[CodeType, Tuple[str, str]]" = weakref.WeakKeyDictionary()
+
+# What the running test touched, {fileName: {name}}, None if no test is tracked
+_touched: Optional[Dict[str, Set[str]]] = None
+
+
+def touch(fileName: Union[str, Path], name: str):
+    """Record that the tracked test (if any) used definition name of fileName."""
+    if _touched is not None:
+        _touched.setdefault(str(fileName), set()).add(name)
+
+
+@contextlib.contextmanager
+def recording() -> Generator[Dict[str, Set[str]], None, None]:
+    """
+    Record what the tracked test touches in this context (nothing if no test is tracked),
+    such that it can be replay()'d whenever what happened here is reused, say from a cache.
+    """
+    global _touched
+    outer = _touched
+    recorded: Dict[str, Set[str]] = {}
+    if outer is None:
+        yield recorded
+        return
+
+    _touched = recorded
+    try:
+        yield recorded
+    finally:
+        _touched = outer
+        replay(recorded)
+
+
+def replay(recorded: Dict[str, Set[str]]):
+    """Touch everything in recorded, see recording()."""
+    for fileName, names in recorded.items():
+        for name in names:
+            touch(fileName, name)
+
+
+def registerCode(code: CodeType, fileName: Union[str, Path]):
+    """Register code compiled from fileName, such that calls to its functions can be traced back to their definitions."""
+    fileName = str(fileName)
+    _codeIndex[code] = (fileName, MODULE)
+
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            for nested in _walkCode(const):
+                _codeIndex[nested] = (fileName, const.co_name)
+
+
+def _walkCode(code: CodeType) -> Iterable[CodeType]:
+    yield code
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            yield from _walkCode(const)
+
+
+def _trace(frame: FrameType, event: str, arg: Any) -> None:
+    location = _codeIndex.get(frame.f_code)
+    if location is not None and _touched is not None:
+        _touched.setdefault(location[0], set()).add(location[1])
+    return None
+
+
+@contextlib.contextmanager
+def track() -> Generator[Dict[str, Set[str]], None, None]:
+    """Track what definitions of the student's code are touched in this context."""
+    global _touched
+    oldTrace = sys.gettrace()
+    touched: Dict[str, Set[str]] = {}
+    _touched = touched
+    sys.settrace(_trace)
+    try:
+        yield touched
+    finally:
+        sys.settrace(oldTrace)
+        _touched = None
+
+
+def fingerprint(source: str) -> Dict[str, str]:
+    """
+    Hash every top-level function and class definition of source by name,
+    the rest of the top-level code (including the signatures of functions) as <module>,
+    and the entire source as <source>. If source does not parse, only <source> is there.
+    """
+    prints = {SOURCE: _hash(source)}
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return prints
+
+    definitions: Dict[str, str] = {}
+    module = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            definitions[node.name] = definitions.get(node.name, "") + ast.dump(node)
+            signature = ast.dump(type(node)(**{**{f: getattr(node, f) for f in node._fields}, "body": []}))
+            module.append(signature)
+        elif isinstance(node, ast.ClassDef):
+            definitions[node.name] = definitions.get(node.name, "") + ast.dump(node)
+            module.append(ast.dump(node))
+        else:
+            module.append(ast.dump(node))
+
+    prints.update({name: _hash(dump) for name, dump in definitions.items()})
+    prints[MODULE] = _hash("\n".join(module))
+    return prints
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class Regrade:
+    """
+    The state of an incremental regrade of one file:
+    the record of the previous run, and the record of this run that replaces it.
+    """
+    def __init__(self, key: str, previous: Optional[Dict[str, Any]]):
+        self.key = key
+        self._previousTests: Dict[str, Dict[str, Any]] = previous["tests"] if previous else {}
+        self._tests: Dict[str, Dict[str, Any]] = {}
+        self._reused: Set[str] = set()
+        self._fingerprints: Dict[str, Dict[str, str]] = {}
+
+    @staticmethod
+    def load(moduleName: str, testPath: Any, fileName: Any) -> "Regrade":
+        from checkpy.tester import resultcache # avoid circular import
+        key = resultcache.getKey(moduleName, testPath, fileName, hashContent=False)
+        return Regrade(key, resultcache.get(key))
+
+    def save(self):
+        from checkpy.tester import resultcache # avoid circular import
+        resultcache.put(self.key, {"tests": self._tests})
+
+    def reuse(self, testFunction: "TestFunction") -> Tuple[bool, Optional["TestResult"]]:
+        """Get (True, result of the previous run) if testFunction can be reused, (False, None) otherwise."""
+        from checkpy.tests import TestResult # avoid circular import
+
+        previous = self._previousTests.get(testFunction.__name__)
+        if previous is None or not self._isUnchanged(previous["touched"]):
+            return False, None
+
+        # a test that touched nothing read the student's code in a way that is not tracked (say, with open())
+        if not previous["touched"]:
+            return False, None
+
+        preconditions = list(getattr(testFunction, "preconditions", [])) + list(testFunction.dependencies)
+        if any(precondition.__name__ not in self._reused for precondition in preconditions):
+            return False, None
+
+        self._reused.add(testFunction.__name__)
+        self._tests[testFunction.__name__] = previous
+        result = previous["result"]
+        return True, None if result is None else TestResult.fromDict(result)
+
+    @contextlib.contextmanager
+    def track(self, testFunction: "TestFunction") -> Generator[None, None, None]:
+        """Record what testFunction touches while it runs in this context."""
+        with track() as touched:
+            yield
+
+        record: Dict[str, Dict[str, str]] = {}
+        for fileName, names in touched.items():
+            prints = self._fingerprintOf(fileName)
+            # calls into anything that is not a top-level definition (lambdas, comprehensions) are part of <module>
+            names = {name if name in prints else MODULE for name in names}
+            record[fileName] = {name: prints.get(name, "") for name in names}
+
+        self._tests[testFunction.__name__] = {"result": None, "touched": record}
+
+    def record(self, testFunction: "TestFunction", result: Optional["TestResult"]):
+        """Record the result of testFunction, after it ran in track()."""
+        if testFunction.__name__ in self._tests:
+            self._tests[testFunction.__name__]["result"] = None if result is None else result.asDict()
+
+    def _isUnchanged(self, touched: Dict[str, Dict[str, str]]) -> bool:
+        return all(
+            self._fingerprintOf(fileName).get(name) == expected
+            for fileName, prints in touched.items()
+            for name, expected in prints.items()
+        )
+
+    def _fingerprintOf(self, fileName: str) -> Dict[str, str]:
+        """The fingerprint of fileName as it is now, empty if it cannot be read."""
+        if fileName not in self._fingerprints:
+            try:
+                with open(fileName) as f:
+                    self._fingerprints[fileName] = fingerprint(f.read())
+            except (OSError, ValueError):
+                self._fingerprints[fileName] = {}
+        return self._fingerprints[fileName]
@@ -1,19 +1,23 @@
 from checkpy.tester import TesterResult
 from checkpy.tester import runTests as _runTests
+from checkpy.tester import testSubmissions as _testSubmissions
 from checkpy.tester import runTestsSynchronously as _runTestsSynchronously
 from checkpy import caches as _caches
 import checkpy
 import copy
 import checkpy.tester.discovery as _discovery
+import glob as _glob
+import os as _os
 import pathlib as _pathlib
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 
-__all__ = ["testModule", "test", "testOffline"]
+__all__ = ["testModule", "test", "testOffline", "testBatch"]
 
 
-def testModule(moduleName: str, debugMode=False, silentMode=False) -> Optional[List[TesterResult]]:
+def testModule(moduleName: str, debugMode=False, silentMode=False, jobs=1) -> Optional[List[TesterResult]]:
     """
     Test all files from module
+    If jobs is larger than 1, test up to jobs files at the same time.
     """
     _caches.clearAllCaches()
 
@@ -26,7 +30,7 @@ def testModule(moduleName: str, debugMode=False, silentMode=False) -> Optional[L
         checkpy.context.silent = silentMode
         checkpy.context.debug = debugMode
 
-        results = tester.testModule(moduleName)
+        results = tester.testModule(moduleName, jobs=jobs)
     finally:
         checkpy.context = oldContext
 
@@ -57,11 +61,12 @@ def test(fileName: str, debugMode=False, silentMode=False) -> TesterResult:
 
     return result
 
-def testOffline(fileName: str, testPath: str | _pathlib.Path, multiprocessing=True, debugMode=False, silentMode=False) -> TesterResult:
+def testOffline(fileName: str, testPath: str | _pathlib.Path, multiprocessing=True, debugMode=False, silentMode=False, startMethod="spawn") -> TesterResult:
     """
     Run a test offline.
     Takes in the name of file to be tested and an absolute path to the tests directory.
     If multiprocessing is True (by default), runs all tests in a seperate process. All tests run in the same process otherwise.
+    startMethod is either "spawn" (by default) or "forkserver", see checkpy.tester.runTests.
     """
     _caches.clearAllCaches()
 
@@ -76,6 +81,7 @@ def testOffline(fileName: str, testPath: str | _pathlib.Path, multiprocessing=Tr
         oldContext = copy.copy(checkpy.context)
         checkpy.context.silent = silentMode
         checkpy.context.debug = debugMode
+        checkpy.context.startMethod = startMethod
 
         if multiprocessing:
             result = _runTests(testModuleName, testPath, filePath)
@@ -88,6 +94,55 @@ def testOffline(fileName: str, testPath: str | _pathlib.Path, multiprocessing=Tr
 
     return result
 
+def testBatch(
+        fileName: str,
+        submissions: Union[str, Iterable[Union[str, _pathlib.Path]]],
+        testPath: Optional[Union[str, _pathlib.Path]]=None,
+        module: str="",
+        jobs: Optional[int]=None,
+        debugMode=False
+    ) -> Iterator[Tuple[_pathlib.Path, TesterResult]]:
+    """
+    Test the file fileName in many submission directories, for instance all of submissions/*/hello.py
+    Takes in the name of the file and a glob (or list) of submission directories.
+    The tests are looked up once: in testPath if given (like testOffline), in the downloaded tests otherwise.
+    Tests up to jobs submissions at the same time, by default as many as there are CPUs.
+    Yields a (submission, TesterResult) pair as soon as a submission is tested.
+    """
+    _caches.clearAllCaches()
+
+    from . import printer
+    fileStem = fileName.split(".")[0]
+    testFileName = f"{fileStem}Test.py"
+
+    if testPath is None:
+        from . import downloader
+        downloader.updateSilently()
+        testPaths = _discovery.getTestPaths(testFileName, module=module)
+    else:
+        testPaths = _discovery.getTestPathsFrom(testFileName, _pathlib.Path(testPath), module=module)
+
+    if not testPaths:
+        printer.displayError("No test found for {}".format(fileName))
+        return
+
+    if isinstance(submissions, str):
+        submissions = sorted(p for p in _glob.glob(submissions) if _os.path.isdir(p))
+
+    try:
+        oldContext = copy.copy(checkpy.context)
+        checkpy.context.debug = debugMode
+
+        yield from _testSubmissions(
+            fileName,
+            submissions,
+            testPaths[0],
+            jobs=jobs if jobs else (_os.cpu_count() or 1)
+        )
+    finally:
+        checkpy.context = oldContext
+
+
 def _closeAllMatplotlib():
     try:
         if __IPYTHON__: # type: ignore [name-defined]
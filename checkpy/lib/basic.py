@@ -1,4 +1,5 @@
 import contextlib
+import hashlib
 import os
 import pathlib
 import re
@@ -7,15 +8,17 @@ import sys
 import traceback
 
 from pathlib import Path
-from types import ModuleType
-from typing import Any, Iterable, List, Optional, Tuple, Union
+from types import CodeType, ModuleType
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
 from warnings import warn
 
 import checkpy
 import checkpy.tester
 from checkpy.entities import path, exception, function
 from checkpy import caches
-from checkpy.lib.static import getSource
+from checkpy import incremental
+from checkpy import timing
+from checkpy.lib.static import getSource, _readSource
 import checkpy.lib.io
 
 __all__ = [
@@ -123,7 +126,6 @@ def getModuleAndOutputOf(
     checkpy.lib.addOutput(output)
     return mod, output
 
-@caches.cache()
 def _getModuleAndOutputOf(
         fileName: Optional[Union[str, Path]]=None,
         src: Optional[str]=None,
@@ -149,8 +151,50 @@ def _getModuleAndOutputOf(
             )
         fileName = checkpy.file.name
 
+    # outside of the cache, every test that uses the module depends on its top-level code
     if src is None:
-        src = getSource(fileName)
+        incremental.touch(fileName, incremental.MODULE)
+
+    mod, output, touched = _runModule(
+        fileName=fileName,
+        src=src,
+        argv=argv,
+        stdinArgs=stdinArgs,
+        ignoreExceptions=ignoreExceptions,
+        overwriteAttributes=overwriteAttributes
+    )
+
+    # the module may come from the cache, every test that uses it depends on what running it touched
+    incremental.replay(touched)
+    return mod, output
+
+@caches.cache(maxSize=128)
+def _runModule(
+        fileName: Union[str, Path],
+        src: Optional[str]=None,
+        argv: Optional[List[str]]=None,
+        stdinArgs: Optional[List[str]]=None,
+        ignoreExceptions: Iterable[Exception]=(),
+        overwriteAttributes: Iterable[Tuple[str, Any]]=()
+    ) -> Tuple[ModuleType, str, Dict[str, Set[str]]]:
+    """
+    Run src (by default the source of fileName) as a module and capture its output, see _getModuleAndOutputOf().
+    Also returns the definitions that running it touched, see incremental.recording().
+    """
+    with incremental.recording() as touched:
+        mod, output = _runSource(fileName, src, argv, stdinArgs, ignoreExceptions, overwriteAttributes)
+    return mod, output, touched
+
+def _runSource(
+        fileName: Union[str, Path],
+        src: Optional[str],
+        argv: Optional[List[str]],
+        stdinArgs: Optional[List[str]],
+        ignoreExceptions: Iterable[Exception],
+        overwriteAttributes: Iterable[Tuple[str, Any]]
+    ) -> Tuple[ModuleType, str]:
+    if src is None:
+        src = _readSource(fileName)
 
     mod = None
     output = ""
@@ -184,7 +228,8 @@ def _getModuleAndOutputOf(
 
         try:
             # execute code in mod
-            exec(src, mod.__dict__)
+            with timing.measure("import"):
+                exec(_compile(src, fileName), mod.__dict__)
 
             # add resulting module to sys
             sys.modules[moduleName] = mod
@@ -222,6 +267,19 @@ def _getModuleAndOutputOf(
     return mod, output
 
 
+_codeCache = caches._Cache(maxSize=32)
+
+def _compile(src: str, fileName: Union[str, Path]) -> CodeType:
+    """Compile src, the code object is reused for as long as the source of fileName stays the same."""
+    def compileAndRegister() -> CodeType:
+        code = compile(src, "<string>", "exec")
+        incremental.registerCode(code, fileName)
+        return code
+
+    key = (str(fileName), hashlib.sha256(src.encode()).hexdigest())
+    return _codeCache.lookup(key, compileAndRegister)
+
+
 def addOutput(output: str):
     """
     Add output to the active test's output.
@@ -15,8 +15,8 @@ testSquare = test(timeout=3)(declarative
 
 import re
 
-from copy import deepcopy
-from typing import Any, Callable, Dict, Iterable, Optional, List, Union
+from copy import copy
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, List, Tuple, Union
 from typing_extensions import Self
 from uuid import uuid4
 
@@ -79,7 +79,7 @@ class function:
     """
     def __init__(self, functionName: str, fileName: Optional[str]=None): 
         self._initialState: FunctionState = FunctionState(functionName, fileName=fileName)
-        self._stack: List[Callable[["FunctionState"], None]] = []
+        self._stack: _Steps = _Steps()
         self._description: Optional[str] = None
 
         name = self.name(functionName)
@@ -230,7 +230,7 @@ class function:
         
         # If the description step is the only step (after the mandatory name step), put it first
         if len(self._stack) == 2:
-            self._stack.reverse()
+            self._stack = _Steps.of(reversed(tuple(self._stack)))
 
         if self._description is None:
             self._description = description
@@ -251,8 +251,9 @@ class function:
         testDataUnchanged = test()(function("process_data").call("data.txt").do(checkDataFileIsUnchanged))
         ```
         """
-        self = deepcopy(self)
-        self._stack.append(function)
+        # The steps are shared with self and the chain it came from, so this is no copy of the entire chain
+        self = copy(self)
+        self._stack = self._stack.append(function)
         
         self.__name__ = f"declarative_function_test_{self._initialState.name}()_{uuid4()}"
         self.__doc__ = self._description if self._description is not None else self._initialState.description
@@ -270,10 +271,9 @@ class function:
             and test.description != self._initialState.description:
             initialDescription = test.description
 
-        stack = list(self._stack)
-        state = deepcopy(self._initialState)
+        state = self._initialState._copy()
 
-        for step in stack:
+        for step in self._stack:
             step(state)
 
         if initialDescription:
@@ -287,6 +287,42 @@ class function:
         return state
 
 
+class _Steps:
+    """
+    An immutable list of the steps of a chain. Appending gives a new list that shares all steps
+    with this one, such that each method in a chain adds just one step instead of copying all before it.
+    """
+    def __init__(self, previous: Optional["_Steps"]=None, step: Optional[Callable[["FunctionState"], None]]=None):
+        self._previous = previous
+        self._step = step
+        self._length: int = 0 if previous is None else len(previous) + 1
+        self._steps: Optional[Tuple[Callable[["FunctionState"], None], ...]] = None
+
+    @staticmethod
+    def of(steps: Iterable[Callable[["FunctionState"], None]]) -> "_Steps":
+        result = _Steps()
+        for step in steps:
+            result = result.append(step)
+        return result
+
+    def append(self, step: Callable[["FunctionState"], None]) -> "_Steps":
+        return _Steps(self, step)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[Callable[["FunctionState"], None]]:
+        # walked once, a test runs the same chain every time
+        if self._steps is None:
+            steps = []
+            node = self
+            while node._previous is not None:
+                steps.append(node._step)
+                node = node._previous
+            self._steps = tuple(reversed(steps)) # type: ignore [arg-type]
+        return iter(self._steps)
+
+
 class FunctionState:
     """
     The state of the current test.
@@ -305,6 +341,14 @@ class FunctionState:
         self._timeout: int = 10
         self._isDescriptionMutable: bool = True
     
+    def _copy(self) -> "FunctionState":
+        """A copy to run a chain on, only the mutable fields are copied, the (expected) values in them are shared."""
+        state = copy(self)
+        state._params = None if self._params is None else list(self._params)
+        state._args = list(self._args)
+        state._kwargs = dict(self._kwargs)
+        return state
+
     @staticmethod
     def _descriptionFormatter(descr: str, state: "FunctionState") -> str:
         return f"testing {state.name}()" + (f" >> {descr}" if descr else "")
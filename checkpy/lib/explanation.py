@@ -37,7 +37,7 @@ def explainCompare(op: str, left: Any, right: Any) -> Optional[str]:
             return f"'{left.__name__}' is used in the source code"
 
         prefix = f"'{left.__name__}' is not used in the source code\n~"
-        allLines = right.source.split("\n")
+        allLines = checkpy.static._getIndex(right.source).lines
         lineNoWidth = len(str(max(n.lineno for n in right.foundNodes)))
         lines = []
         for node in right.foundNodes:
@@ -14,7 +14,8 @@ __all__ = [
 
 @contextlib.contextmanager
 def captureStdout() -> typing.Generator["_StreamListener", None, None]:
-    listener = _StreamListener(sys.stdout)
+    from checkpy import context # avoid circular import
+    listener = _StreamListener(sys.stdout, limit=context.captureLimit) # type: ignore [arg-type]
     try:
         listener.start()
         yield listener
@@ -25,11 +26,11 @@ def captureStdout() -> typing.Generator["_StreamListener", None, None]:
 
 
 @contextlib.contextmanager
-def replaceStdout() -> typing.Generator["_Stream", None, None]:
+def replaceStdout(limit: typing.Optional[int]=None) -> typing.Generator["_Stream", None, None]:
     old_stdout = sys.stdout
     old_stderr = sys.stderr
 
-    stdout = _Stream()
+    stdout = _Stream(limit=limit)
 
     try:
         sys.stdout = stdout
@@ -72,10 +73,16 @@ def replaceStdin() -> typing.Generator[typing.TextIO, None, None]:
         __builtins__["input"] = oldInput
 
 
-class _Stream(io.StringIO):
-    def __init__(self, *args, **kwargs):
-        io.StringIO.__init__(self, *args, **kwargs)
+class _Stream(io.TextIOBase):
+    """
+    A write-only text stream that passes everything written to it on to its listeners.
+    It keeps nothing itself, such that output is only kept (once per listener) while someone listens.
+    """
+    def __init__(self, limit: typing.Optional[int]=None):
+        super().__init__()
         self._listeners: typing.List["_StreamListener"] = []
+        self._limit = limit
+        self._nWritten = 0
 
     def register(self, listener: "_StreamListener"):
         self._listeners.append(listener)
@@ -83,26 +90,48 @@ class _Stream(io.StringIO):
     def unregister(self, listener: "_StreamListener"):
         self._listeners.remove(listener)
 
-    def write(self, text: str):
-        """Overwrites StringIO.write to update all listeners"""
-        io.StringIO.write(self, text)
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        """Update all listeners with text"""
+        self._count(len(text))
         self._onUpdate(text)
+        return len(text)
 
     def writelines(self, lines: typing.Iterable):
-        """Overwrites StringIO.writelines to update all listeners"""
-        io.StringIO.writelines(self, lines)
+        """Update all listeners with each of the lines"""
+        lines = list(lines)
+        self._count(sum(len(line) for line in lines))
         for line in lines:
             self._onUpdate(line)
 
+    def _count(self, nChars: int):
+        """Keep track of the number of characters written, raise a ResourceLimitError once these exceed the limit"""
+        self._nWritten += nChars
+        if self._limit is not None and self._nWritten > self._limit:
+            raise exception.ResourceLimitError(
+                message=f"printed more than {self._limit} characters, the maximum allowed"
+            )
+
     def _onUpdate(self, content: str):
         for listener in self._listeners:
             listener.update(content)
 
 
 class _StreamListener:
-    def __init__(self, stream: _Stream):
+    """
+    Keeps everything written to stream while started.
+    Writes are kept as a list of chunks and only joined once content is read,
+    such that printing many short lines takes linear time (for each of the listeners).
+    With a limit only about the first and last limit // 2 characters are kept (see checkpy.tests._OutputBuffer),
+    content is then truncated like the output of a test, but memory no longer grows with what is written.
+    """
+    def __init__(self, stream: _Stream, limit: typing.Optional[int]=None):
+        from checkpy.tests import _OutputBuffer # avoid circular import
         self._stream = stream
-        self.content = ""
+        self._chunks: typing.List[str] = []
+        self._buffer = None if limit is None else _OutputBuffer(limit)
 
     def start(self):
         self.stream.register(self)
@@ -111,8 +140,19 @@ class _StreamListener:
         self.stream.unregister(self)
 
     def update(self, content: str):
-        self.content += content
+        if self._buffer is None:
+            self._chunks.append(content)
+        else:
+            self._buffer.write(content)
+
+    @property
+    def content(self) -> str:
+        if self._buffer is not None:
+            return self._buffer.format()
+        if len(self._chunks) > 1:
+            self._chunks[:] = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
 
     @property
     def stream(self) -> _Stream:
-        return self._stream
\ No newline at end of file
+        return self._stream
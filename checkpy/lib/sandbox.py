@@ -1,15 +1,23 @@
 import contextlib
+import errno
 import glob
 import os
 import shutil
+import sys
 import tempfile
 from pathlib import Path
-from typing import List, Set, Optional, Union
+from typing import Dict, List, Set, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None # type: ignore [assignment]
 
 import requests
 
 import checkpy
 
+from checkpy import timing
 from checkpy.entities.exception import TooManyFilesError, MissingRequiredFiles, DownloadError
 
 
@@ -18,6 +26,9 @@ __all__ = ["exclude", "include", "includeFromTests", "only", "require", "downloa
 
 DEFAULT_FILE_LIMIT = 10000
 
+# ioctl that clones a file on Linux filesystems with copy-on-write (btrfs, xfs, ...), see ioctl_ficlone(2)
+_FICLONE = 0x40049409
+
 
 def exclude(*patterns: Union[str, Path]):
     """
@@ -199,7 +210,7 @@ class IncludedFrom:
             dest = (Path.cwd() / self.source.name).absolute()
 
         origin = self.source.absolute()
-        shutil.copy(origin, dest)
+        _populate(origin, dest)
         self._isIncluded = True
 
 class Download:
@@ -228,8 +239,16 @@ class Download:
 
 @contextlib.contextmanager
 def sandbox(name: Union[str, Path]=""):
+    """
+    Run in a sandbox once only/include/exclude/require/download is called in this context.
+    A sandbox within another sandbox (that of a test within that of the test module) is a _Clone of its root,
+    that is reused by the next test that configures its own sandbox.
+    """
+    global _depth
+
     tempDir = None
     dir = None
+    clone: Optional[_Clone] = None
 
     oldIncluded: Set[str] = set()
     oldExcluded: Set[str] = set()
@@ -253,7 +272,7 @@ def sandbox(name: Union[str, Path]=""):
             dest = (sandboxDir / f).absolute()
             dest.parent.mkdir(parents=True, exist_ok=True)
             origin = (config.root / f).absolute()
-            shutil.copy(origin, dest)
+            _populate(origin, dest)
 
         oldIncluded = set(config.includedFiles)
         oldExcluded = set(config.excludedFiles)
@@ -262,23 +281,132 @@ def sandbox(name: Union[str, Path]=""):
         if config.missingRequiredFiles:
             raise MissingRequiredFiles(config.missingRequiredFiles)
 
-        nonlocal tempDir
-        nonlocal dir
-        if dir is None or tempDir is None:
-            tempDir = tempfile.TemporaryDirectory()
-            dir = Path(Path(tempDir.name) / name)
-            dir.mkdir(exist_ok=True)
-            os.chdir(dir)
-        
-        sync(config, dir)
-
+        nonlocal tempDir, dir, clone, oldIncluded, oldExcluded
+        with timing.measure("sandbox"):
+            if dir is None and _depth > 1 and not name:
+                clone = _acquireClone(config.root)
+                if clone is not None:
+                    # the clone holds the regular files, sync() takes care of anything else
+                    oldIncluded = {f for f in config.includedFiles if _isClonable(config.root, f)}
+                    oldExcluded = set(config.excludedFiles)
+                    clone.sync(oldIncluded)
+                    dir = clone.dir
+                    os.chdir(dir)
+
+            if dir is None:
+                tempDir = tempfile.TemporaryDirectory()
+                dir = Path(Path(tempDir.name) / name)
+                dir.mkdir(exist_ok=True)
+                os.chdir(dir)
+
+            sync(config, dir)
+
+    _depth += 1
     with sandboxConfig(onUpdate=onUpdate):
         try:
             yield
         finally:
+            _depth -= 1
             os.chdir(config.root)
+            if clone:
+                clone.isInUse = False
             if tempDir:
-                tempDir.cleanup()
+                with timing.measure("sandbox"):
+                    tempDir.cleanup()
+            if _depth == 0:
+                clearClones()
+
+
+# The number of sandbox() contexts entered, and the clones made for sandboxes within another, by root
+_depth = 0
+_clones: Dict[Path, "_Clone"] = {}
+
+# (inode, size, modification time, change time, mode) of a file
+_Stamp = Tuple[int, int, int, int, int]
+
+
+class _Clone:
+    """
+    A directory that is kept identical to (the regular files of) a template directory.
+    Syncing only repopulates the files that changed in either directory since the last sync,
+    so that setting up the sandbox of a test takes O(changed files) instead of O(all files).
+    """
+    def __init__(self, template: Path):
+        self.template = template
+        self.isInUse = False
+        self._tempDir = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tempDir.name)
+        # (stamp of the template's file, stamp of the clone's file) right after the last sync, by relative path
+        self._stamps: Dict[str, Tuple[Optional[_Stamp], Optional[_Stamp]]] = {}
+
+    def sync(self, files: Set[str]):
+        """Make the clone hold exactly files (relative to the template) as they are in the template now."""
+        present = set(_listFiles(self.dir))
+        for f in present - files:
+            os.remove(self.dir / f)
+            self._stamps.pop(f, None)
+        _removeEmptyDirs(self.dir)
+
+        for f in files:
+            origin = self.template / f
+            dest = self.dir / f
+            templateStamp = _stamp(origin)
+            if f in present and self._stamps.get(f) == (templateStamp, _stamp(dest)):
+                continue
+
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            _populate(origin, dest)
+            self._stamps[f] = (templateStamp, _stamp(dest))
+
+    def cleanup(self):
+        self._tempDir.cleanup()
+
+
+def _acquireClone(template: Path) -> Optional[_Clone]:
+    """The clone of template, None if it is in use by another sandbox already."""
+    clone = _clones.get(template)
+    if clone is None:
+        clone = _clones[template] = _Clone(template)
+    elif clone.isInUse:
+        return None
+    clone.isInUse = True
+    return clone
+
+
+def clearClones():
+    """Remove all clones, happens once the outermost sandbox closes."""
+    for clone in _clones.values():
+        clone.cleanup()
+    _clones.clear()
+
+
+def _isClonable(root: Path, fileName: str) -> bool:
+    path = Path(fileName)
+    return not path.is_absolute() and ".." not in path.parts and (root / path).is_file()
+
+
+def _stamp(path: Path) -> Optional[_Stamp]:
+    try:
+        stat = os.stat(path, follow_symlinks=False)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_mode)
+
+
+def _listFiles(root: Path) -> List[str]:
+    """The paths (relative to root) of everything in root that is not a directory. Symlinks are not followed."""
+    files: List[str] = []
+    for dirPath, dirNames, fileNames in os.walk(root):
+        # symlinks to directories are listed as directories, but not walked into
+        files.extend(os.path.relpath(os.path.join(dirPath, d), root) for d in dirNames if os.path.islink(os.path.join(dirPath, d)))
+        files.extend(os.path.relpath(os.path.join(dirPath, f), root) for f in fileNames)
+    return files
+
+
+def _removeEmptyDirs(root: Path):
+    for dirPath, dirNames, fileNames in os.walk(root, topdown=False):
+        if dirPath != str(root) and not os.listdir(dirPath):
+            os.rmdir(dirPath)
 
 
 @contextlib.contextmanager
@@ -302,6 +430,51 @@ def cd(dest: Union[str, Path]):
         os.chdir(origin)
 
 
+# (device of the origin, device of the destination) pairs between which cloning is not supported
+_noReflinks: Set[Tuple[int, int]] = set()
+_UNSUPPORTED = {errno.EXDEV, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EINVAL, errno.ENOTTY, errno.ENOSYS}
+
+
+def _populate(origin: Path, dest: Path):
+    """
+    Put the file origin at dest, as a reflink (a copy-on-write clone) on Linux filesystems that support these (btrfs, xfs),
+    copied otherwise. Reflinks do not work if the sandbox (in tempfile.gettempdir()) is on another filesystem than origin.
+    There are no hardlinks: tested code can chmod a link to a file it owns and change the original through it,
+    and Linux (fs.protected_hardlinks) refuses to link files of others that this process cannot write.
+    Adds the number of bytes copied and the number of bytes cloned to the sandbox timings.
+    """
+    stat = os.stat(origin)
+    devices = (stat.st_dev, os.stat(dest.parent).st_dev)
+
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(dest)
+
+    if _reflink(origin, dest, devices):
+        timing.record("sandbox", bytesCloned=stat.st_size)
+        return
+
+    shutil.copy(origin, dest)
+    timing.record("sandbox", bytesCopied=stat.st_size)
+
+
+def _reflink(origin: Path, dest: Path, devices: Tuple[int, int]) -> bool:
+    if fcntl is None or not sys.platform.startswith("linux") or devices in _noReflinks:
+        return False
+
+    try:
+        with open(origin, "rb") as source, open(dest, "wb") as target:
+            fcntl.ioctl(target.fileno(), _FICLONE, source.fileno())
+    except OSError as e:
+        if e.errno in _UNSUPPORTED:
+            _noReflinks.add(devices)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(dest)
+        return False
+
+    shutil.copymode(origin, dest)
+    return True
+
+
 def _glob(
         pattern: Union[str, Path],
         root: Union[str, Path, None]=None,
@@ -1,26 +1,40 @@
 import ast as _ast
+import concurrent.futures as _futures
+import copy as _copy
 import io as _io
-import re as _re
+import multiprocessing as _mp
+import os as _os
+import time as _time
 import tokenize as _tokenize
 
 from pathlib import Path as _Path
+from typing import Any as _Any
+from typing import Callable as _Callable
+from typing import Dict as _Dict
+from typing import Iterable as _Iterable
 from typing import Optional as _Optional
 from typing import Union as _Union
 from typing import List as _List
+from typing import Set as _Set
+from typing import Tuple as _Tuple
 
 import checkpy as _checkpy
+import checkpy.caches as _caches
 import checkpy.entities.exception as _exception
+import checkpy.incremental as _incremental
 
 
 __all__ = [
     "getSource",
     "getSourceOfDefinitions",
     "removeComments",
+    "getTokens",
     "getNumbersFrom",
     "getFunctionCalls",
     "getFunctionDefinitions",
     "getAstNodes",
-    "AbstractSyntaxTree"
+    "AbstractSyntaxTree",
+    "analyze"
 ]
 
 
@@ -33,8 +47,45 @@ def getSource(fileName: _Optional[_Union[str, _Path]]=None) -> str:
             )
         fileName = _checkpy.file.name
 
-    with open(fileName) as f:
-        return f.read()
+    # the test depends on the entire source, see checkpy --incremental
+    _incremental.touch(fileName, _incremental.SOURCE)
+    return _readSource(fileName)
+
+
+# The source of each file by (path, inode, size, modification time), and the tree, tokens, source without comments
+# and static index of each source.
+# These are shared by all static checks (and imports) of a run, and cleared by caches.clearAllCaches().
+# Trees and tokens are handed out as is, so treat them as read-only.
+_sourceCache = _caches._Cache(maxSize=32)
+_treeCache = _caches._Cache(maxSize=32)
+_tokenCache = _caches._Cache(maxSize=32)
+_uncommentedCache = _caches._Cache(maxSize=32)
+_indexCache = _caches._Cache(maxSize=32)
+
+# Like git, do not trust the stat of a file that was modified just now, it could change again within the same timestamp
+_RACY_NS = 2 * 10**9
+
+
+def _readSource(fileName: _Union[str, _Path]) -> str:
+    path = _os.path.abspath(fileName)
+    stat = _os.stat(path)
+
+    def read() -> str:
+        with open(path) as f:
+            return f.read()
+
+    if _time.time_ns() - stat.st_mtime_ns < _RACY_NS:
+        return read()
+
+    return _sourceCache.lookup((path, stat.st_ino, stat.st_size, stat.st_mtime_ns), read)
+
+
+def _getTree(source: str) -> _ast.Module:
+    return _treeCache.lookup(source, lambda: _ast.parse(source))
+
+
+def _getIndex(source: str) -> "_Index":
+    return _indexCache.lookup(source, lambda: _Index(source))
 
 
 def getSourceOfDefinitions(fileName: _Optional[_Union[str, _Path]]=None) -> str:
@@ -46,40 +97,8 @@ def getSourceOfDefinitions(fileName: _Optional[_Union[str, _Path]]=None) -> str:
             )
         fileName = _checkpy.file.name
 
-    source = getSource(fileName)
-
-    class Visitor(_ast.NodeVisitor):
-        def __init__(self):
-            self.lineNumbers = set()
-
-        def visit_ClassDef(self, node: _ast.ClassDef):
-            if node.end_lineno is None:
-                self.lineNumbers.add(node.lineno - 1)
-            else:
-                self.lineNumbers |= set(range(node.lineno - 1, node.end_lineno))
-            super().generic_visit(node)
-        
-        def visit_FunctionDef(self, node: _ast.FunctionDef):
-            if node.end_lineno is None:
-                self.lineNumbers.add(node.lineno - 1)
-            else:
-                self.lineNumbers |= set(range(node.lineno - 1, node.end_lineno))
-            super().generic_visit(node)
-
-        def visit_Import(self, node: _ast.Import):
-            self.lineNumbers.add(node.lineno - 1)
-            super().generic_visit(node)
-
-        def visit_ImportFrom(self, node: _ast.ImportFrom):
-            self.lineNumbers.add(node.lineno - 1)
-            super().generic_visit(node)
-
-    tree = _ast.parse(source)
-    visitor = Visitor()
-    visitor.visit(tree)
-
-    lines = source.split("\n")
-    return "\n".join(lines[n] for n in sorted(visitor.lineNumbers))
+    index = _getIndex(getSource(fileName))
+    return "\n".join(index.lines[n] for n in sorted(index.definitionLines))
 
 
 def getNumbersFrom(text: str) -> _List[_Union[int, float]]:
@@ -118,12 +137,15 @@ def getNumbersFrom(text: str) -> _List[_Union[int, float]]:
 # inspiration from http://stackoverflow.com/questions/1769332/script-to-remove-python-comments-docstrings
 def removeComments(source: str) -> str:
     """Remove comments from a string containing Python source code."""
-    io_obj = _io.StringIO(source)
-    out = ""
+    return _uncommentedCache.lookup(source, lambda: _removeComments(source))
+
+
+def _removeComments(source: str) -> str:
+    out: _List[str] = []
     last_lineno = -1
     last_col = 0
     indentation = "\t"
-    for token_type, token_string, (start_line, start_col), (end_line, end_col), ltext in _tokenize.generate_tokens(io_obj.readline):
+    for token_type, token_string, (start_line, start_col), (end_line, end_col), ltext in getTokens(source):
         if start_line > last_lineno:
             last_col = 0
 
@@ -133,78 +155,55 @@ def removeComments(source: str) -> str:
 
         # write indentation
         if start_col > last_col and last_col == 0:
-            out += indentation * (start_col - last_col)
+            out.append(indentation * (start_col - last_col))
         # write other whitespace
         elif start_col > last_col:
-            out += " " * (start_col - last_col)
+            out.append(" " * (start_col - last_col))
 
         # ignore comments
         if token_type == _tokenize.COMMENT:
             pass
         # put all docstrings on a single line
         elif token_type == _tokenize.STRING:
-            out += _re.sub("\n", " ", token_string)
+            out.append(token_string.replace("\n", " "))
         else:
-            out += token_string
+            out.append(token_string)
 
         last_col = end_col
         last_lineno = end_line
-    return out
-
-
-def getFunctionCalls(source: _Optional[str]=None) -> _List[str]:
-    """Get all names of function called in source."""
-    class CallVisitor(_ast.NodeVisitor):
-        def __init__(self):
-            self.parts = []
+    return "".join(out)
 
-        def visit_Attribute(self, node):
-            super().generic_visit(node)
-            self.parts.append(node.attr)
 
-        def visit_Name(self, node):
-            self.parts.append(node.id)
+def getTokens(source: _Optional[str]=None) -> _Tuple[_tokenize.TokenInfo, ...]:
+    """
+    Get all tokens of source, for lexical checks such as on names or string literals.
+    The tokens are shared with the other static checks, so this tokenizes each source just once.
+    For instance:
 
-        @property
-        def call(self):
-            return ".".join(self.parts)
+    ```
+    names = [token.string for token in getTokens() if token.type == tokenize.NAME]
+    ```
+    """
+    if source is None:
+        source = getSource()
 
-    class FunctionsVisitor(_ast.NodeVisitor):
-        def __init__(self):
-            self.functionCalls = []
+    return _tokenCache.lookup(source, lambda: tuple(_tokenize.generate_tokens(_io.StringIO(source).readline)))
 
-        def visit_Call(self, node):
-            callVisitor = CallVisitor()
-            callVisitor.visit(node.func)
-            super().generic_visit(node)
-            self.functionCalls.append(callVisitor.call)
 
+def getFunctionCalls(source: _Optional[str]=None) -> _List[str]:
+    """Get all names of function called in source."""
     if source is None:
         source = getSource()
 
-    tree = _ast.parse(source)
-    visitor = FunctionsVisitor()
-    visitor.visit(tree)
-    return visitor.functionCalls
+    return [name for name, lineno in _getIndex(source).calls]
 
 
 def getFunctionDefinitions(source: _Optional[str]=None) -> _List[str]:
     """Get all names of Function definitions from source."""
-    class FunctionsVisitor(_ast.NodeVisitor):
-        def __init__(self):
-            self.functionNames = []
-
-        def visit_FunctionDef(self, node: _ast.FunctionDef):
-            self.functionNames.append(node.name)
-            super().generic_visit(node)
-
     if source is None:
         source = getSource()
 
-    tree = _ast.parse(source)
-    visitor = FunctionsVisitor()
-    visitor.visit(tree)
-    return visitor.functionNames
+    return [definition.name for definition in _getIndex(source).definitions if definition.kind is _ast.FunctionDef]
 
 
 def getAstNodes(*types: type, source: _Optional[str]=None) -> _List[_ast.AST]:
@@ -218,27 +217,16 @@ def getAstNodes(*types: type, source: _Optional[str]=None) -> _List[_ast.AST]:
     getAstNodes(ast.Mult, ast.Add) # Will find all uses of multiplication (*) and addition (+)
     ```
     """
-    nodes: _List[_ast.AST] = []
-
-    class Visitor(_ast.NodeVisitor):
-        def __init__(self):
-            self.lineNumber = 0
-
-        def generic_visit(self, node: _ast.AST):
-            if hasattr(node, "lineno"):
-                self.lineNumber = node.lineno
-
-            if any(isinstance(node, type_) for type_ in types):
-                node.lineno = self.lineNumber
-                nodes.append(node)
-
-            super().generic_visit(node)
-
     if source is None:
         source = getSource()
 
-    tree = _ast.parse(source)
-    Visitor().visit(tree)
+    nodes: _List[_ast.AST] = []
+    for node, lineno in _getIndex(source).find(*types):
+        if getattr(node, "lineno", None) != lineno:
+            # nodes without a location (operators, contexts) can be shared, so give out a copy with the line number
+            node = _copy.copy(node)
+            node.lineno = lineno # type: ignore [attr-defined]
+        nodes.append(node)
     return nodes
 
 
@@ -261,4 +249,189 @@ class AbstractSyntaxTree:
 
     def __contains__(self, item: type) -> bool:
         self.foundNodes = getAstNodes(item, source=self.source)        
-        return bool(self.foundNodes)
\ No newline at end of file
+        return bool(self.foundNodes)
+
+
+# Either ast types, or a function that takes the source
+_Query = _Union[type, _Tuple[type, ...], _Callable[[str], _Any]]
+
+
+def analyze(
+        fileNames: _Iterable[_Union[str, _Path]],
+        queries: _Dict[str, _Query],
+        jobs: _Optional[int]=None
+    ) -> _Dict[str, _Dict[str, _Any]]:
+    """
+    Run static checks over many files (a cohort of submissions for instance) without running any of them.
+    Each query is either ast types, for which the result is the line number of every use,
+    or a function that takes the source, for which the result is what it returns (so getFunctionCalls works).
+    Returns a table with a row per file: {fileName: {queryName: result}}.
+    If a file cannot be read or parsed, each of its results is the SourceException saying why.
+
+    Files are spread over jobs processes (by default as many as there are CPUs),
+    so function queries must be picklable, that is defined at the top level of a module.
+    For example:
+
+    ```
+    analyze(glob.glob("submissions/*/hello.py"), {"loops": (ast.For, ast.While), "calls": getFunctionCalls})
+    ```
+    """
+    names = [str(fileName) for fileName in fileNames]
+    if jobs is None:
+        jobs = _os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(names)))
+
+    if jobs == 1:
+        rows = [_analyzeFile(name, queries) for name in names]
+    else:
+        # a few chunks per process, each file takes just milliseconds
+        chunkSize = max(1, len(names) // (jobs * 4))
+        with _futures.ProcessPoolExecutor(max_workers=jobs, mp_context=_mp.get_context("spawn")) as executor:
+            rows = list(executor.map(_analyzeFile, names, [queries] * len(names), chunksize=chunkSize))
+
+    return dict(zip(names, rows))
+
+
+def _analyzeFile(fileName: str, queries: _Dict[str, _Query]) -> _Dict[str, _Any]:
+    try:
+        with open(fileName) as f:
+            source = f.read()
+        index = _getIndex(source)
+    except (OSError, SyntaxError, ValueError) as e:
+        error = _exception.SourceException(exception=e, message="while reading {}".format(fileName))
+        return {name: error for name in queries}
+
+    row: _Dict[str, _Any] = {}
+    for name, query in queries.items():
+        if isinstance(query, tuple) or isinstance(query, type):
+            types = query if isinstance(query, tuple) else (query,)
+            row[name] = [lineno for node, lineno in index.find(*types)]
+        else:
+            row[name] = query(source)
+    return row
+
+
+class _Definition:
+    """A function (or class) definition, with its parameters and the lines it spans."""
+    def __init__(self, node: _Union[_ast.FunctionDef, _ast.AsyncFunctionDef, _ast.ClassDef]):
+        self.name = node.name
+        self.kind = type(node)
+        self.lineno = node.lineno
+        self.endLineno = node.end_lineno
+
+        self.params: _List[str] = []
+        if not isinstance(node, _ast.ClassDef):
+            args = node.args
+            self.params = [arg.arg for arg in args.posonlyargs + args.args]
+            if args.vararg:
+                self.params.append("*" + args.vararg.arg)
+            self.params.extend(arg.arg for arg in args.kwonlyargs)
+            if args.kwarg:
+                self.params.append("**" + args.kwarg.arg)
+
+
+class _Index:
+    """
+    Everything the static checks look up in source, found in a single walk over its tree:
+    all nodes by type, the definitions, the function calls and imports (with their line numbers),
+    and the lines of definitions and imports (see getSourceOfDefinitions).
+    """
+    def __init__(self, source: str):
+        self.source = source
+        self.lines = source.split("\n")
+
+        # (position in the walk, node, line number) by type of node
+        self.nodes: _Dict[type, _List[_Tuple[int, _ast.AST, int]]] = {}
+        self.definitions: _List[_Definition] = []
+        self.calls: _List[_Tuple[str, int]] = []
+        self.imports: _List[_Tuple[str, int]] = []
+        self.definitionLines: _Set[int] = set()
+
+        self._position = 0
+        self._lineno = 0
+        self._visit(_getTree(source))
+
+    def find(self, *types: type) -> _List[_Tuple[_ast.AST, int]]:
+        """All (node, line number) of the given types, in the order of a walk over the tree."""
+        # ast.Num and alike are no superclass of the node types they match, these decide per node
+        isPerNode = any(type(t) is not type for t in types)
+
+        found: _List[_Tuple[int, _ast.AST, int]] = []
+        for nodeType, entries in self.nodes.items():
+            if issubclass(nodeType, types):
+                found.extend(entries)
+            elif isPerNode:
+                found.extend(entry for entry in entries if isinstance(entry[1], types))
+
+        found.sort(key=lambda entry: entry[0])
+        return [(node, lineno) for _, node, lineno in found]
+
+    def _visit(self, node: _ast.AST):
+        # nodes without a line number get that of the node visited last
+        lineno: _Optional[int] = getattr(node, "lineno", None)
+        if lineno is None:
+            lineno = self._lineno
+        else:
+            self._lineno = lineno
+
+        # ast.parse only creates nodes of the exact types, so look them up by type rather than with isinstance
+        nodeType = type(node)
+        entries = self.nodes.get(nodeType)
+        if entries is None:
+            entries = self.nodes[nodeType] = []
+        entries.append((self._position, node, self._lineno))
+        self._position += 1
+
+        if nodeType in _DEFINITION_TYPES:
+            self._addDefinition(node) # type: ignore [arg-type]
+        elif nodeType is _ast.Import or nodeType is _ast.ImportFrom:
+            self._addImport(node) # type: ignore [arg-type]
+
+        # same as ast.iter_child_nodes, inlined as this is by far the hottest loop
+        for field in node._fields:
+            value = getattr(node, field, None)
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, _ast.AST):
+                        self._visit(item)
+            elif isinstance(value, _ast.AST):
+                self._visit(value)
+
+        # calls within the call (its arguments) come first
+        if nodeType is _ast.Call:
+            self.calls.append((_getCallName(node.func), lineno)) # type: ignore [attr-defined]
+
+    def _addDefinition(self, node: _Union[_ast.FunctionDef, _ast.AsyncFunctionDef, _ast.ClassDef]):
+        self.definitions.append(_Definition(node))
+        if not isinstance(node, _ast.AsyncFunctionDef):
+            end = node.lineno if node.end_lineno is None else node.end_lineno
+            self.definitionLines.update(range(node.lineno - 1, end))
+
+    def _addImport(self, node: _Union[_ast.Import, _ast.ImportFrom]):
+        if isinstance(node, _ast.Import):
+            self.imports.extend((alias.name, node.lineno) for alias in node.names)
+        else:
+            module = "." * node.level + (node.module or "")
+            self.imports.extend((module + ("" if module.endswith(".") else ".") + alias.name, node.lineno) for alias in node.names)
+        self.definitionLines.add(node.lineno - 1)
+
+
+_DEFINITION_TYPES = {_ast.FunctionDef, _ast.AsyncFunctionDef, _ast.ClassDef}
+
+
+def _getCallName(func: _ast.AST) -> str:
+    """The dotted name of what is called, for instance os.path.join"""
+    parts: _List[str] = []
+
+    def visit(node: _ast.AST):
+        if isinstance(node, _ast.Attribute):
+            visit(node.value)
+            parts.append(node.attr)
+        elif isinstance(node, _ast.Name):
+            parts.append(node.id)
+        else:
+            for child in _ast.iter_child_nodes(node):
+                visit(child)
+
+    visit(func)
+    return ".".join(parts)
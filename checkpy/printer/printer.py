@@ -80,6 +80,40 @@ def displayError(message: str) -> str:
         print(msg)
     return msg
 
+def displayTimings(timings: typing.Dict[str, typing.Dict[str, float]], testResults: typing.Iterable[checkpy.tests.TestResult]) -> str:
+    lines = ["{}Timings (wall time / cpu time):{}".format(_Colors.NAME, _Colors.ENDC)]
+    for name, timing in sorted(timings.items(), key=lambda item: -item[1]["wallTime"]):
+        extras = "".join(", {} {}".format(key, int(value)) for key, value in timing.items() if key not in ("wallTime", "cpuTime", "count"))
+        lines.append("   {:.3f}s / {:.3f}s {} ({}x{})".format(timing["wallTime"], timing["cpuTime"], name, int(timing["count"]), extras))
+    for testResult in testResults:
+        if testResult.wallTime is not None and testResult.cpuTime is not None:
+            lines.append("   {:.3f}s / {:.3f}s test: {}".format(testResult.wallTime, testResult.cpuTime, testResult.description))
+
+    msg = "\n".join(lines)
+    if not checkpy.context.silent:
+        print(msg)
+    return msg
+
+def displayChanges(previousResults: typing.Iterable[checkpy.tests.TestResult], testResults: typing.Iterable[checkpy.tests.TestResult]) -> str:
+    previousStatus = {tr.description: tr.hasPassed for tr in previousResults}
+    statusNames = {True: "passing", False: "failing", None: "not checked"}
+
+    lines = []
+    for testResult in testResults:
+        if testResult.description not in previousStatus:
+            continue
+        before = previousStatus[testResult.description]
+        if before != testResult.hasPassed:
+            color, smiley = _selectColorAndSmiley(testResult)
+            lines.append("{}{} now {} (was {}): {}{}".format(
+                color, smiley, statusNames[testResult.hasPassed], statusNames[before], testResult.description, _Colors.ENDC
+            ))
+
+    msg = "\n".join(lines) if lines else "{}No changes since the previous run{}".format(_Colors.NAME, _Colors.ENDC)
+    if not checkpy.context.silent:
+        print(msg)
+    return msg
+
 def _selectColorAndSmiley(testResult: checkpy.tests.TestResult) -> typing.Tuple[str, str]:
     if testResult.hasPassed:
         return _Colors.PASS, _Smileys.HAPPY
@@ -1,3 +1,5 @@
 from checkpy.tester.tester import *
+from checkpy.tester.pool import TesterPool
+from checkpy.tester.watcher import watch
 
-__all__ = ["test", "testModule", "getActiveTest", "only", "include", "exclude", "require"]
\ No newline at end of file
+__all__ = ["test", "testModule", "getActiveTest", "TesterPool", "watch", "only", "include", "exclude", "require"]
\ No newline at end of file
@@ -0,0 +1,331 @@
+import atexit
+import builtins
+import os
+import pathlib
+import queue
+import random
+import sys
+import threading
+import traceback
+
+import multiprocessing as mp
+import multiprocessing.connection
+
+from types import ModuleType
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import checkpy
+import checkpy.lib
+import checkpy.lib.sandbox
+import checkpy.tester.tester
+from checkpy import caches
+from checkpy.entities import exception
+from checkpy.tests import TestFunction
+from checkpy.tester.tester import TesterResult, _Sender, _Signal, _Tester, _awaitResult, _getMultiprocessingContext, _hasLimits, _isLibraryPath, _isLocalPath
+
+
+__all__ = ["TesterPool"]
+
+
+DEFAULT_MAX_JOBS_PER_WORKER = 100
+
+# How long to wait for a worker to clean up after a job, before giving up on it
+CLEANUP_TIMEOUT = 5
+
+
+class TesterPool:
+    """
+    A pool of persistent tester processes that have checkpy (and its dependencies) imported already.
+    Each call to runTests() runs on an idle worker, and blocks while all workers are busy.
+    A worker is recycled after maxJobsPerWorker runs, after a timeout, after a crash and after a run with resource limits.
+    Workers are started with checkpy.context.startMethod as it is when the pool is created.
+
+    Note that the isolation between runs is weaker than that of a fresh process per run (checkpy.tester.runTests).
+    Between runs a worker unloads the tests and student code, and restores checkpy's state, the builtins,
+    os.environ, the recursion limit and the random state. A worker with threads of the student still running is recycled.
+    Anything else the student code changes in the process (say, a library it patched) can carry over to the next run.
+
+    For example:
+
+    ```
+    with TesterPool(size=4) as pool:
+        result = tester.test("hello.py", pool=pool)
+    ```
+    """
+    def __init__(self, size: Optional[int]=None, maxJobsPerWorker: int=DEFAULT_MAX_JOBS_PER_WORKER):
+        self.size = size if size else (os.cpu_count() or 1)
+        self.maxJobsPerWorker = maxJobsPerWorker
+
+        self._ctx = _getMultiprocessingContext()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._idleWorkers: "queue.LifoQueue[_Worker]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._workers: List[_Worker] = []
+        self._isClosed = False
+
+        atexit.register(self.close)
+
+    def runTests(
+            self,
+            moduleName: str,
+            testPath: pathlib.Path,
+            fileName: str,
+            cwd: Optional[Union[str, pathlib.Path]]=None
+        ) -> TesterResult:
+        """
+        Same as checkpy.tester.runTests(), but runs on a warm worker from the pool.
+        The tests run from cwd (the current working directory by default), which is where the sandbox is populated from.
+        """
+        job = _Job(
+            moduleName=moduleName,
+            testPath=pathlib.Path(testPath),
+            filePath=pathlib.Path(fileName).absolute(),
+            context=checkpy.context,
+            cwd=str(cwd) if cwd is not None else os.getcwd()
+        )
+
+        with self._slots:
+            worker = self._acquire()
+            try:
+                result, isTimeout = worker.run(job)
+            except exception.CheckpyError:
+                self._replace(worker)
+                raise
+
+            # resource limits are set as hard limits, these cannot be lifted for the next job
+            if isTimeout or not worker.isClean or worker.nJobs >= self.maxJobsPerWorker or _hasLimits(job.context):
+                self._replace(worker)
+            else:
+                self._release(worker)
+
+        return result
+
+    def close(self):
+        """Stop all workers. The pool cannot be used afterwards."""
+        with self._lock:
+            if self._isClosed:
+                return
+            self._isClosed = True
+            workers, self._workers = self._workers, []
+
+        for worker in workers:
+            worker.stop()
+
+        atexit.unregister(self.close)
+
+    def __enter__(self) -> "TesterPool":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _acquire(self) -> "_Worker":
+        while True:
+            try:
+                worker = self._idleWorkers.get_nowait()
+            except queue.Empty:
+                return self._start()
+
+            if worker.isAlive:
+                return worker
+
+            self._remove(worker)
+
+    def _release(self, worker: "_Worker"):
+        self._idleWorkers.put(worker)
+
+    def _replace(self, worker: "_Worker"):
+        """Kill worker, and immediately start warming up its replacement."""
+        worker.kill()
+        self._remove(worker)
+        self._idleWorkers.put(self._start())
+
+    def _start(self) -> "_Worker":
+        with self._lock:
+            if self._isClosed:
+                raise exception.CheckpyError(message="Cannot run tests on a TesterPool that is closed.")
+            worker = _Worker(self._ctx)
+            self._workers.append(worker)
+            return worker
+
+    def _remove(self, worker: "_Worker"):
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+
+
+class _Job:
+    def __init__(
+            self,
+            moduleName: str,
+            testPath: pathlib.Path,
+            filePath: pathlib.Path,
+            context: "checkpy._Context",
+            cwd: str
+        ):
+        self.moduleName = moduleName
+        self.testPath = testPath
+        self.filePath = filePath
+        self.context = context
+        self.cwd = cwd
+
+
+class _Worker:
+    def __init__(self, ctx: "Union[mp.context.SpawnContext, mp.context.ForkServerContext]"):
+        self.jobQueue: "mp.Queue[Optional[_Job]]" = ctx.Queue()
+        self.receiver, sender = ctx.Pipe(duplex=False)
+        self.process = ctx.Process(target=_work, args=(self.jobQueue, sender), name="TesterWorker")
+        self.process.start()
+        sender.close()
+        self.nJobs = 0
+        self.isClean = True
+
+    @property
+    def isAlive(self) -> bool:
+        return self.process.is_alive()
+
+    def run(self, job: _Job) -> Tuple[TesterResult, bool]:
+        self.nJobs += 1
+        self.jobQueue.put(job)
+        result, isTimeout = _awaitResult(self.process, self.receiver, job.filePath)
+        if not isTimeout:
+            self.isClean = self._awaitCleanup()
+        return result, isTimeout
+
+    def _awaitCleanup(self) -> bool:
+        """After each job the worker reports whether it could restore its state."""
+        if not self.receiver.poll(CLEANUP_TIMEOUT):
+            return False
+        try:
+            return self.receiver.recv() is True
+        except EOFError:
+            return False
+
+    def stop(self):
+        if self.isAlive:
+            self.jobQueue.put(None)
+            self.process.join(timeout=1)
+        self.kill()
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join()
+        self.receiver.close()
+
+
+class _Outbox:
+    """Passes messages on to the sender, while keeping track of whether a result was sent."""
+    def __init__(self, sender: _Sender):
+        self._sender = sender
+        self.hasResult = False
+
+    def put(self, message: Union[_Signal, TesterResult]):
+        # only once it is sent, a result that cannot be pickled (say, with an exception class of the student) is never sent
+        self._sender.put(message)
+        if isinstance(message, TesterResult):
+            self.hasResult = True
+
+
+def _work(jobQueue: "mp.Queue[Optional[_Job]]", connection: mp.connection.Connection):
+    """The main loop of a pool worker, runs jobs until it receives None."""
+    sender = _Sender(connection)
+    baseCwd = os.getcwd()
+    basePath = list(sys.path)
+    baseArgv = list(sys.argv)
+    baseModules = dict(sys.modules)
+    baseState = _InterpreterState()
+
+    while True:
+        job = jobQueue.get()
+        if job is None:
+            return
+
+        outbox = _Outbox(sender)
+        try:
+            os.chdir(job.cwd)
+            sys.path[:] = basePath + [str(job.filePath.parent), str(job.testPath)]
+            _resetState()
+
+            checkpy.context = job.context
+            tester = _Tester(job.moduleName, job.testPath, job.filePath, outbox, outbox) # type: ignore [arg-type]
+            tester.run()
+        except Exception:
+            traceback.print_exc()
+        finally:
+            if not outbox.hasResult:
+                sender.put(None)
+
+            # the parent may print right after receiving the result
+            sys.stdout.flush()
+
+            _unloadModules(baseModules, job)
+            os.chdir(baseCwd)
+            sys.path[:] = basePath
+            sys.argv = list(baseArgv)
+            isClean = baseState.restore()
+
+        # only now the parent can hand out this worker again, or recycle it
+        connection.send(isClean)
+
+
+class _InterpreterState:
+    """The state of the interpreter that student code is most likely to change, as it is when the worker starts."""
+    def __init__(self):
+        self.builtins: Dict[str, Any] = dict(builtins.__dict__)
+        self.environ: Dict[str, str] = dict(os.environ)
+        self.recursionLimit = sys.getrecursionlimit()
+        self.threads = set(threading.enumerate())
+
+    def restore(self) -> bool:
+        """Put this state back in place, returns False if that is not possible because threads of the student still run."""
+        for name in set(builtins.__dict__) - set(self.builtins):
+            del builtins.__dict__[name]
+        builtins.__dict__.update(self.builtins)
+
+        if os.environ != self.environ:
+            os.environ.clear()
+            os.environ.update(self.environ)
+
+        sys.setrecursionlimit(self.recursionLimit)
+
+        # seeded from os.urandom, like a fresh process
+        random.seed()
+
+        return not any(thread.is_alive() for thread in threading.enumerate() if thread not in self.threads)
+
+
+def _resetState():
+    """Give the next job the same checkpy state as a freshly started process."""
+    caches.clearAllCaches()
+    checkpy.file = None
+    checkpy.testPath = None
+    checkpy.USERPATH = pathlib.Path.cwd()
+    checkpy.lib.sandbox.config = checkpy.lib.sandbox.Config()
+    checkpy.lib.sandbox.clearClones()
+    checkpy.tester.tester._activeTest = None
+    TestFunction._previousPriority = -1
+
+
+def _unloadModules(baseModules: Dict[str, ModuleType], job: _Job):
+    """
+    Remove the test module and all student code from sys.modules, keep checkpy and installed libraries.
+    Everything from the tests or the submission goes, even from site-packages (where downloaded tests live).
+    Any module that was present when the worker started is put back in place (student code can overwrite __main__).
+    """
+    localDirs = [job.testPath, job.filePath.parent]
+    for name, module in list(sys.modules.items()):
+        if name in baseModules:
+            sys.modules[name] = baseModules[name]
+        elif name == job.moduleName or _isUnloadable(name, module, localDirs):
+            del sys.modules[name]
+
+
+def _isUnloadable(name: str, module: ModuleType, localDirs: List[pathlib.Path]) -> bool:
+    if name == "checkpy" or name.startswith("checkpy.") or name in sys.builtin_module_names:
+        return False
+
+    fileName = getattr(module, "__file__", None)
+    if fileName is None:
+        return getattr(module, "__spec__", None) is None
+
+    return _isLocalPath(fileName, localDirs) or not _isLibraryPath(fileName)
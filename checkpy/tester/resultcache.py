@@ -0,0 +1,158 @@
+"""
+An opt-in, persistent cache of test results (checkpy --cache).
+
+Results are stored as json (TesterResult.asDict()) in the user's cache directory, keyed by a hash of:
+- the tested file, its name and content
+- the python files in the tests directory (the test module and any helpers it may import)
+- the files the test module includes through includeFromTests()
+- the checkpy and python version, and the settings that change results (limits, --dev)
+
+Other files in the directory of the tested file are not part of the key,
+so do not use the cache for tests that read those files with include() or require().
+"""
+
+import ast
+import hashlib
+import importlib.metadata
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import checkpy
+
+
+__all__ = ["getKey", "get", "put", "prune"]
+
+
+_CACHEPATH = pathlib.Path(os.environ.get("XDG_CACHE_HOME", pathlib.Path.home() / ".cache")) / "checkpy" / "results"
+
+
+def getKey(
+        moduleName: str,
+        testPath: Union[str, pathlib.Path],
+        fileName: Union[str, pathlib.Path],
+        hashContent: bool=True
+    ) -> str:
+    """
+    The key of the result of testing fileName with moduleName (from testPath) in the current context.
+    Without hashContent the key is of the location of fileName instead of its content (see checkpy.incremental).
+    """
+    testPath = pathlib.Path(testPath)
+    filePath = pathlib.Path(fileName)
+
+    sha = hashlib.sha256()
+    sha.update(json.dumps([
+        importlib.metadata.version("checkpy"),
+        sys.version,
+        moduleName,
+        filePath.name,
+        checkpy.context.debug,
+        checkpy.context.outputLimit,
+        checkpy.context.memoryLimit,
+        checkpy.context.cpuLimit,
+        checkpy.context.openFilesLimit,
+        checkpy.context.stdoutLimit,
+        checkpy.context.captureLimit
+    ]).encode())
+    if hashContent:
+        sha.update(filePath.read_bytes())
+    else:
+        sha.update(b"incremental" + str(filePath.absolute()).encode())
+
+    testFiles = set(testPath.glob("*.py")) | set(_getIncludedFromTests(testPath / (moduleName + ".py"), testPath))
+    for path in sorted(testFiles):
+        sha.update(os.path.relpath(path, testPath).encode())
+        sha.update(path.read_bytes())
+
+    return sha.hexdigest()
+
+
+def get(key: str) -> Optional[Dict[str, Any]]:
+    """Get the cached result of key, or None if there is none."""
+    path = _CACHEPATH / (key + ".json")
+    try:
+        with open(path) as f:
+            result = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # mark as recently used, see prune()
+    path.touch()
+    return result
+
+
+def put(key: str, result: Dict[str, Any]):
+    """Store result under key. Writes are atomic, so concurrent runs never see half a result."""
+    _CACHEPATH.mkdir(parents=True, exist_ok=True)
+    fd, tempPath = tempfile.mkstemp(dir=_CACHEPATH, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(result, f)
+        os.replace(tempPath, _CACHEPATH / (key + ".json"))
+    except BaseException:
+        os.remove(tempPath)
+        raise
+
+
+def prune(maxAge: float=0) -> int:
+    """Remove all results that were not used in the last maxAge seconds. Returns the number of removed results."""
+    if not _CACHEPATH.exists():
+        return 0
+
+    nRemoved = 0
+    now = time.time()
+    for path in _CACHEPATH.glob("*.json"):
+        try:
+            if now - path.stat().st_mtime >= maxAge:
+                path.unlink()
+                nRemoved += 1
+        except FileNotFoundError:
+            pass
+    return nRemoved
+
+
+def _getIncludedFromTests(testFilePath: pathlib.Path, testPath: pathlib.Path) -> List[pathlib.Path]:
+    """
+    All files the test module might include through includeFromTests().
+    If the patterns passed to includeFromTests() are not all string literals, that is everything in testPath.
+    """
+    try:
+        tree = ast.parse(testFilePath.read_text())
+    except (OSError, SyntaxError, ValueError):
+        return []
+
+    patterns: List[str] = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+
+        func = node.func
+        name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+        if name != "includeFromTests":
+            continue
+
+        for arg in node.args:
+            if not isinstance(arg, ast.Constant) or not isinstance(arg.value, str):
+                return list(_files([testPath]))
+            patterns.append(arg.value)
+
+    included: List[pathlib.Path] = []
+    for pattern in patterns:
+        # same as the sandbox: implicitly recursive iff no / in pattern and starts with *
+        if "/" not in pattern and pattern.startswith("*"):
+            pattern = "**/" + pattern
+        included.extend(_files(testPath.glob(pattern)))
+    return included
+
+
+def _files(paths: Iterable[pathlib.Path]) -> Iterable[pathlib.Path]:
+    for path in paths:
+        if path.is_dir():
+            yield from (p for p in path.rglob("*") if p.is_file())
+        elif path.is_file():
+            yield path
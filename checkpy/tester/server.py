@@ -0,0 +1,368 @@
+"""
+A long-running grading server (checkpy --serve ADDRESS), for autograders that would otherwise start checkpy per submission.
+Listens on a Unix socket, or on host:port if ADDRESS contains a ":". Submissions are tested on a warm TesterPool,
+exactly like checkpy --batch does. The API is plain HTTP with json bodies:
+
+POST /test    {"file": "hello.py", "submission": "/path/to/submission", "module": ""}
+              or {"file": "hello.py", "tarball": "<base64 of a (gzipped) tar of the submission>"}
+              responds with TesterResult.asDict()
+GET  /status  {"jobs": 4, "running": 1, "queued": 0, "completed": 12, "draining": false}
+POST /drain   stop accepting jobs, finish the running and queued ones, then stop the server
+
+Requests with a body over maxBodySize bytes, or a tarball that extracts to over maxExtractedSize bytes or
+maxMembers files, are refused with 413. Once maxQueued submissions wait for a tester, new ones are refused with 503.
+"""
+
+import base64
+import binascii
+import contextlib
+import http.server
+import io
+import json
+import os
+import pathlib
+import shutil
+import socket
+import socketserver
+import stat
+import tarfile
+import tempfile
+import threading
+
+from typing import Any, Callable, Dict, Iterator, Optional, Union, cast
+
+import checkpy
+from checkpy.tester import discovery
+from checkpy.tester.pool import TesterPool
+from checkpy.tester.tester import TesterResult, _testSubmission
+
+
+__all__ = ["GradingServer"]
+
+
+DEFAULT_MAX_BODY_SIZE = 16 * 1024 * 1024
+DEFAULT_MAX_EXTRACTED_SIZE = 64 * 1024 * 1024
+DEFAULT_MAX_MEMBERS = 1000
+DEFAULT_MAX_QUEUED = 100
+
+
+class _BadRequest(Exception):
+    """A job that cannot be graded, status is the http status to respond with."""
+    def __init__(self, message: str, status: int=400):
+        super().__init__(message)
+        self.status = status
+
+
+class GradingServer:
+    """
+    Grades submissions sent to address on a TesterPool of size jobs (by default as many as there are CPUs).
+    At most jobs submissions are tested at the same time, at most maxQueued others wait in the queue.
+    Tests are looked up in testPath if given, in the downloaded tests otherwise.
+    """
+    def __init__(
+            self,
+            address: str,
+            jobs: Optional[int]=None,
+            testPath: Optional[Union[str, pathlib.Path]]=None,
+            maxQueued: int=DEFAULT_MAX_QUEUED,
+            maxBodySize: int=DEFAULT_MAX_BODY_SIZE,
+            maxExtractedSize: int=DEFAULT_MAX_EXTRACTED_SIZE,
+            maxMembers: int=DEFAULT_MAX_MEMBERS
+        ):
+        self.testPath = None if testPath is None else pathlib.Path(testPath)
+        self.pool = TesterPool(size=jobs)
+
+        self.maxQueued = maxQueued
+        self.maxBodySize = maxBodySize
+        self.maxExtractedSize = maxExtractedSize
+        self.maxMembers = maxMembers
+
+        self.nRunning = 0
+        self.nQueued = 0
+        self.nCompleted = 0
+        self.isDraining = False
+
+        self._slots = threading.BoundedSemaphore(self.pool.size)
+        self._lock = threading.Lock()
+
+        if ":" in address:
+            host, port = address.rsplit(":", 1)
+            self._httpServer: Union[_TCPServer, _UnixServer] = _TCPServer((host or "localhost", int(port)), _Handler)
+        else:
+            self._httpServer = _UnixServer(address, _Handler)
+        self._httpServer.grader = self
+
+    @property
+    def address(self) -> str:
+        """The address the server listens on, with the actual port if it was started on port 0."""
+        address = self._httpServer.server_address
+        if isinstance(address, tuple):
+            return "{}:{}".format(*address[:2])
+        return str(address)
+
+    def serveForever(self):
+        """Serve until drained (or interrupted), then wait for all running jobs to finish and stop the pool."""
+        isSilent = checkpy.context.silent
+        checkpy.context.silent = True
+        try:
+            self._httpServer.serve_forever()
+        except KeyboardInterrupt:
+            self.isDraining = True
+        finally:
+            # joins the threads of all requests that are still in progress
+            self._httpServer.server_close()
+            self.pool.close()
+            checkpy.context.silent = isSilent
+
+    def drain(self):
+        """Stop accepting jobs, serveForever() returns once the running and queued jobs are done."""
+        self.isDraining = True
+        # shutdown() blocks until serve_forever() stops, so it cannot be called from the thread that serves
+        threading.Thread(target=self._httpServer.shutdown, daemon=True).start()
+
+    @property
+    def isFull(self) -> bool:
+        """Whether all testers are busy and the queue is full, a new submission would be refused."""
+        return self.nRunning + self.nQueued >= self.pool.size + self.maxQueued
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "jobs": self.pool.size,
+                "running": self.nRunning,
+                "queued": self.nQueued,
+                "completed": self.nCompleted,
+                "draining": self.isDraining
+            }
+
+    def grade(self, job: Dict[str, Any]) -> TesterResult:
+        """Test the submission of job, see the module docstring for its fields. Raises _BadRequest if it cannot."""
+        if self.isDraining:
+            raise _BadRequest("Server is draining", status=503)
+
+        fileName = job.get("file")
+        module = job.get("module") or ""
+        if not isinstance(fileName, str) or not fileName or not isinstance(module, str):
+            raise _BadRequest("Expected the name of the file to test as \"file\"")
+        if ("submission" in job) == ("tarball" in job):
+            raise _BadRequest("Expected either a \"submission\" directory or a \"tarball\"")
+
+        testPath = self._getTestPath(fileName, module)
+
+        # take a place in the queue before extracting, such that a full queue also bounds the extracted tarballs
+        with self._slot() as waitForTester, self._submission(job) as submission:
+            waitForTester()
+            return _testSubmission(fileName, submission, testPath, self.pool)
+
+    def _getTestPath(self, fileName: str, module: str) -> pathlib.Path:
+        testFileName = fileName.split(".")[0] + "Test.py"
+        if self.testPath is not None:
+            testPaths = discovery.getTestPathsFrom(testFileName, self.testPath, module=module)
+        else:
+            testPaths = discovery.getTestPaths(testFileName, module=module)
+
+        if not testPaths:
+            raise _BadRequest("No test found for {}".format(fileName), status=404)
+        return testPaths[0]
+
+    @contextlib.contextmanager
+    def _submission(self, job: Dict[str, Any]) -> Iterator[pathlib.Path]:
+        """The submission directory of job, a temporary one with the extracted tarball if it has one."""
+        if "submission" in job:
+            submission = pathlib.Path(str(job["submission"])).absolute()
+            if not submission.is_dir():
+                raise _BadRequest("Submission is not a directory: {}".format(submission))
+            yield submission
+            return
+
+        try:
+            data = base64.b64decode(str(job["tarball"]), validate=True)
+        except (binascii.Error, ValueError):
+            raise _BadRequest("Tarball is not valid base64")
+
+        with tempfile.TemporaryDirectory() as tempDir:
+            try:
+                with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+                    _extractSafely(tar, pathlib.Path(tempDir), self.maxExtractedSize, self.maxMembers)
+            except tarfile.TarError as e:
+                raise _BadRequest("Invalid tarball: {}".format(e))
+            yield pathlib.Path(tempDir)
+
+    @contextlib.contextmanager
+    def _slot(self) -> Iterator[Callable[[], None]]:
+        """
+        Queue a submission, raises _BadRequest (503) if the queue is full.
+        Yields a function that waits until a tester is free, the submission then runs until the context exits.
+        """
+        with self._lock:
+            if self.isFull:
+                raise _BadRequest("Too many submissions queued, try again later", status=503)
+            self.nQueued += 1
+
+        isRunning = False
+        def waitForTester():
+            nonlocal isRunning
+            self._slots.acquire()
+            with self._lock:
+                self.nQueued -= 1
+                self.nRunning += 1
+            isRunning = True
+
+        try:
+            yield waitForTester
+        finally:
+            if isRunning:
+                self._slots.release()
+                with self._lock:
+                    self.nRunning -= 1
+                    self.nCompleted += 1
+            else:
+                with self._lock:
+                    self.nQueued -= 1
+
+
+def _extractSafely(tar: tarfile.TarFile, path: pathlib.Path, maxSize: int, maxMembers: int):
+    """
+    Extract the regular files and directories of tar into path, refuses anything that would end up outside of path.
+    Refuses tarballs of more than maxMembers members, or that extract to more than maxSize bytes,
+    before extracting the member that would exceed either.
+    """
+    root = path.resolve()
+    size = 0
+    for i, member in enumerate(tar):
+        if i >= maxMembers:
+            raise _BadRequest("Tarball contains more than {} files".format(maxMembers), status=413)
+
+        size += member.size if member.isfile() else 0
+        if size > maxSize:
+            raise _BadRequest("Tarball extracts to more than {} bytes".format(maxSize), status=413)
+
+        target = (root / member.name).resolve()
+        if target != root and root not in target.parents:
+            raise _BadRequest("Tarball contains a path outside of the submission: {}".format(member.name))
+
+        if member.isdir():
+            target.mkdir(parents=True, exist_ok=True)
+        elif member.isfile():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            source = tar.extractfile(member)
+            assert source is not None
+            with source, open(target, "wb") as f:
+                shutil.copyfileobj(source, f)
+        # links, devices and fifos are skipped
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    server_version = "checkpy"
+
+    @property
+    def grader(self) -> GradingServer:
+        return cast(Union[_TCPServer, _UnixServer], self.server).grader
+
+    def do_GET(self):
+        if self.path == "/status":
+            self._respond(200, self.grader.status())
+        else:
+            self._respond(404, {"error": "Not found: {}".format(self.path)})
+
+    def do_POST(self):
+        grader = self.grader
+
+        if self.path == "/drain":
+            grader.drain()
+            self._respond(202, grader.status())
+            return
+
+        if self.path != "/test":
+            self._respond(404, {"error": "Not found: {}".format(self.path)})
+            return
+
+        try:
+            # refuse early, without reading the tarball into memory
+            if grader.isFull:
+                self._discardBody()
+                raise _BadRequest("Too many submissions queued, try again later", status=503)
+            job = self._readJson(grader.maxBodySize)
+            result = grader.grade(job)
+        except _BadRequest as e:
+            self._respond(e.status, {"error": str(e)})
+            return
+        except Exception as e:
+            self._respond(500, {"error": "{}: {}".format(type(e).__name__, e)})
+            return
+
+        self._respond(200, result.asDict())
+
+    def _readJson(self, maxSize: int) -> Dict[str, Any]:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            raise _BadRequest("Expected a json body")
+        if length < 0:
+            raise _BadRequest("Expected a json body")
+        if length > maxSize:
+            self._discardBody()
+            raise _BadRequest("Body is larger than {} bytes".format(maxSize), status=413)
+
+        try:
+            job = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise _BadRequest("Expected a json body")
+        if not isinstance(job, dict):
+            raise _BadRequest("Expected a json object")
+        return job
+
+    def _discardBody(self):
+        """Read the body in chunks without keeping it, such that the client gets to read the response."""
+        try:
+            remaining = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            return
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 64 * 1024))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+
+    def _respond(self, status: int, body: Dict[str, Any]):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self) -> str:
+        # Unix sockets have no client address
+        return str(self.client_address[0]) if self.client_address else "local"
+
+    def log_message(self, format: str, *args: Any):
+        pass
+
+
+class _TCPServer(http.server.ThreadingHTTPServer):
+    # non-daemon threads, such that server_close() waits for the requests in progress
+    daemon_threads = False
+    grader: GradingServer
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = False
+    grader: GradingServer
+
+    def server_bind(self):
+        # a socket left behind by a server that did not stop cleanly, nothing listens on it anymore
+        if os.path.exists(self.server_address) and stat.S_ISSOCK(os.stat(self.server_address).st_mode):
+            with socket.socket(socket.AF_UNIX) as probe:
+                try:
+                    probe.connect(self.server_address)
+                except ConnectionRefusedError:
+                    os.remove(self.server_address)
+        super().server_bind()
+        self._isBound = True
+
+    def server_close(self):
+        super().server_close()
+        if getattr(self, "_isBound", False):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.server_address)
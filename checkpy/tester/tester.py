@@ -1,15 +1,20 @@
 import checkpy
+from checkpy import caches
+from checkpy import incremental
 from checkpy import printer
+from checkpy import timing
 from checkpy.entities import exception
 from checkpy.tester import discovery
+from checkpy.tester import resultcache
 from checkpy.lib.sandbox import sandbox
 from checkpy.lib.explanation import explainCompare
 from checkpy.tests import Test, TestResult, TestFunction
 import checkpy.lib.io
 
 from types import ModuleType
-from typing import Dict, Iterable, List, Optional, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar, Union, TYPE_CHECKING
 
+import ast
 import copy
 import contextlib
 import os
@@ -18,14 +23,24 @@ import queue
 import subprocess
 import sys
 import importlib
+import importlib.util
+import math
+import signal
+import sysconfig
 import time
 import warnings
 
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
 import dessert
 import multiprocessing as mp
+import multiprocessing.connection
+
+if TYPE_CHECKING:
+    from checkpy.tester.pool import TesterPool
 
 
-__all__ = ["getActiveTest", "test", "testModule", "TesterResult", "runTests", "runTestsSynchronously"]
+__all__ = ["getActiveTest", "test", "testModule", "testFiles", "testSubmissions", "TesterResult", "runTests", "runTestsSynchronously"]
 
 
 _activeTest: Optional[Test] = None
@@ -39,7 +54,8 @@ def test(
         testName: str,
         module="",
         debugMode: Union[bool, None]=None, 
-        silentMode: Union[bool, None]=None
+        silentMode: Union[bool, None]=None,
+        pool: Optional["TesterPool"]=None
     ) -> "TesterResult":
     if debugMode is not None:
         checkpy.context.debug = debugMode
@@ -84,7 +100,8 @@ def test(
             f.write("".join([l for l in lines if "get_ipython" not in l]))
 
     with _addToSysPath(filePath):
-        testerResult = runTests(
+        testerResult = _runTestsCached(
+            pool.runTests if pool else runTests,
             testFileName.split(".")[0],
             testPath,
             path
@@ -100,7 +117,9 @@ def test(
 def testModule(
         module: str, 
         debugMode: Union[bool, None]=None, 
-        silentMode: Union[bool, None]=None
+        silentMode: Union[bool, None]=None,
+        pool: Optional["TesterPool"]=None,
+        jobs: int=1
     ) -> Optional[List["TesterResult"]]:
     if debugMode is not None:
         checkpy.context.debug = debugMode
@@ -114,59 +133,386 @@ def testModule(
         printer.displayError("no tests found in module: {}".format(module))
         return None
 
-    return [test(testName, module=module) for testName in testNames]
+    return list(testFiles(testNames, module=module, jobs=jobs, pool=pool))
+
+
+def testFiles(
+        fileNames: Iterable[str],
+        module: str="",
+        jobs: int=1,
+        debugMode: Union[bool, None]=None,
+        silentMode: Union[bool, None]=None,
+        pool: Optional["TesterPool"]=None,
+        ordered: bool=True
+    ) -> Iterator["TesterResult"]:
+    """
+    Test all files, running up to jobs files at the same time on a TesterPool.
+    If no pool is passed, a pool of size jobs is created for the duration of the run.
+    Yields the TesterResults in the order of fileNames, and prints them in that order too.
+    If ordered is False, each TesterResult is yielded (and printed) as soon as its file is tested instead.
+    If testing a file fails unexpectedly while running in parallel, its result contains the error.
+    """
+    if debugMode is not None:
+        checkpy.context.debug = debugMode
 
-def runTests(moduleName: str, testPath: pathlib.Path, fileName: str) -> "TesterResult":
-    result: Optional[TesterResult] = None
+    if silentMode is not None:
+        checkpy.context.silent = silentMode
+
+    if jobs <= 1:
+        for fileName in fileNames:
+            yield test(fileName, module=module, pool=pool)
+        return
+
+    from checkpy.tester.pool import TesterPool # avoid circular import
+
+    def testSafely(fileName: str, pool: "TesterPool") -> TesterResult:
+        try:
+            return test(fileName, module=module, pool=pool)
+        except exception.CheckpyError as e:
+            result = TesterResult(pathlib.Path(fileName).name)
+            result.addOutput(printer.displayError(str(e)))
+            return result
+
+    # testers print as they go, so silence them and print the output of each file in order
+    isSilent = checkpy.context.silent
+    checkpy.context.silent = True
+    try:
+        with contextlib.nullcontext(pool) if pool else TesterPool(size=jobs) as activePool,\
+                ThreadPoolExecutor(max_workers=jobs) as executor:
+            for _, future in _inWindow(
+                    lambda fileName: executor.submit(testSafely, fileName, activePool),
+                    fileNames,
+                    window=jobs * 2,
+                    ordered=ordered
+                ):
+                result = future.result()
+                if not isSilent:
+                    print("\n".join(result.output))
+                yield result
+    finally:
+        checkpy.context.silent = isSilent
+
+
+def testSubmissions(
+        fileName: str,
+        submissions: Iterable[Union[str, pathlib.Path]],
+        testPath: pathlib.Path,
+        jobs: int=1,
+        pool: Optional["TesterPool"]=None
+    ) -> Iterator[Tuple[pathlib.Path, "TesterResult"]]:
+    """
+    Test the file fileName in every submission directory against the tests in testPath.
+    Each submission is tested from its own directory, on up to jobs workers of a TesterPool.
+    If no pool is passed, a pool of size jobs is created for the duration of the run.
+    Yields (submission, TesterResult) pairs as soon as each submission is tested, testers do not print.
+    """
+    from checkpy.tester.pool import TesterPool # avoid circular import
+
+    jobs = max(jobs, 1)
+
+    isSilent = checkpy.context.silent
+    checkpy.context.silent = True
+    try:
+        with contextlib.nullcontext(pool) if pool else TesterPool(size=jobs) as activePool,\
+                ThreadPoolExecutor(max_workers=jobs) as executor:
+            for submission, future in _inWindow(
+                    lambda submission: executor.submit(_testSubmission, fileName, submission.absolute(), testPath, activePool),
+                    (pathlib.Path(submission) for submission in submissions),
+                    window=jobs * 2,
+                    ordered=False
+                ):
+                yield submission, future.result()
+    finally:
+        checkpy.context.silent = isSilent
+
+
+_Item = TypeVar("_Item")
+
+
+def _inWindow(
+        submit: Callable[[_Item], "Future[TesterResult]"],
+        items: Iterable[_Item],
+        window: int,
+        ordered: bool=True
+    ) -> Iterator[Tuple[_Item, "Future[TesterResult]"]]:
+    """
+    Submit each item, such that at most window futures are running besides the one that is yielded.
+    Yields (item, future) once each future is done, in the order of items or, if not ordered, as they complete.
+    If ordered, futures that are done wait until those before them are yielded, while the next items are submitted.
+    That way one slow item does not hold up the others, only the done futures behind it are kept.
+    Yielded futures are dropped. The futures that were not yielded yet are cancelled when the generator is closed.
+    """
+    itemIterator = iter(items)
+    # in the order of submission
+    futures: Dict["Future[TesterResult]", _Item] = {}
+    running: Set["Future[TesterResult]"] = set()
+
+    def fill():
+        while len(running) < window:
+            try:
+                item = next(itemIterator)
+            except StopIteration:
+                return
+            future = submit(item)
+            futures[future] = item
+            running.add(future)
 
+    try:
+        fill()
+        while futures:
+            if ordered:
+                future = next(iter(futures))
+                if not future.done():
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    running.difference_update(done)
+                    fill()
+                    continue
+            else:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                future = next(future for future in futures if future in done)
+            running.discard(future)
+            item = futures.pop(future)
+
+            # keep the workers busy while the result is handled
+            fill()
+            yield item, future
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def _testSubmission(fileName: str, submission: pathlib.Path, testPath: pathlib.Path, pool: "TesterPool") -> "TesterResult":
+    """
+    Test the file fileName in the submission directory against the tests in testPath, on a tester of pool.
+    Errors (a missing file, no test) are part of the returned TesterResult.
+    """
+    path = discovery.getPath(submission / fileName)
+    if path is None:
+        result = TesterResult(fileName)
+        result.addOutput(printer.displayError("File not found: {}".format(submission / fileName)))
+        return result
+
+    if path.suffix == ".ipynb":
+        result = TesterResult(path.name)
+        result.addOutput(printer.displayError("Jupyter notebooks are not supported when testing submissions: {}".format(path)))
+        return result
+
+    moduleName = fileName.split(".")[0] + "Test"
+    try:
+        return _runTestsCached(pool.runTests, moduleName, testPath, str(path), cwd=submission)
+    except exception.CheckpyError as e:
+        result = TesterResult(path.name)
+        result.addOutput(printer.displayError(str(e)))
+        return result
+
+
+def _runTestsCached(
+        run: Callable[..., "TesterResult"],
+        moduleName: str,
+        testPath: pathlib.Path,
+        fileName: str,
+        **kwargs: Any
+    ) -> "TesterResult":
+    """
+    Same as run(moduleName, testPath, fileName, **kwargs), but with checkpy.context.cache
+    the result is taken from (and stored in) the result cache, see checkpy.tester.resultcache.
+    """
+    if not checkpy.context.cache:
+        return run(moduleName, testPath, fileName, **kwargs)
+
+    key = resultcache.getKey(moduleName, testPath, fileName)
+
+    if not checkpy.context.refreshCache:
+        cachedResult = resultcache.get(key)
+        if cachedResult is not None:
+            result = TesterResult.fromDict(cachedResult)
+            if not checkpy.context.silent:
+                print("\n".join(result.output))
+            return result
+
+    result = run(moduleName, testPath, fileName, **kwargs)
+
+    # results without tests (timeouts, missing files) are cheap to get again and may well differ next time
+    if result.nTests > 0:
+        resultcache.put(key, result.asDict())
+    return result
+
+
+def runTests(moduleName: str, testPath: pathlib.Path, fileName: str) -> "TesterResult":
     with _addToSysPath(testPath):
-        ctx = mp.get_context("spawn")
+        ctx = _getMultiprocessingContext(pathlib.Path(testPath) / (moduleName + ".py"))
 
-        signalQueue: "mp.Queue[_Signal]" = ctx.Queue()
-        resultQueue: "mp.Queue[TesterResult]" = ctx.Queue()
-        tester = _Tester(moduleName, testPath, pathlib.Path(fileName), signalQueue, resultQueue)
+        # signals and the result share one pipe, so that they arrive in the order they were sent
+        receiver, sender = ctx.Pipe(duplex=False)
+        tester = _Tester(moduleName, testPath, pathlib.Path(fileName), _Sender(sender), _Sender(sender)) # type: ignore [arg-type]
         p = ctx.Process(target=tester.run, name="Tester")
         p.start()
 
-        start = time.time()
-        isTiming = False
-
-        while p.is_alive():
-            while not signalQueue.empty():
-                signal = signalQueue.get()
-
-                if signal.description is not None:
-                    description = signal.description
-                if signal.isTiming is not None:
-                    isTiming = signal.isTiming
-                if signal.timeout is not None:
-                    timeout = signal.timeout
-                if signal.resetTimer:
-                    start = time.time()
-
-            if isTiming and time.time() - start > timeout:
-                result = TesterResult(pathlib.Path(fileName).name)
-                result.addOutput(printer.displayError("Timeout ({} seconds) reached during: {}".format(timeout, description)))
-                p.terminate()
-                p.join()
-                return result
-
-            if not resultQueue.empty():
-                # .get before .join to prevent hanging indefinitely due to a full pipe
-                # https://bugs.python.org/issue8426
-                result = resultQueue.get()
-                p.terminate()
-                p.join()
-                break
-
-            time.sleep(0.1)
-
-        if not resultQueue.empty():
-            result = resultQueue.get()
-
-        if result is None:
-            raise exception.CheckpyError(message="An error occured while testing. The testing process exited unexpectedly.")
+        # close the parent's end of the sender, so that receiving fails once the tester is gone
+        sender.close()
+
+        try:
+            result, _ = _awaitResult(p, receiver, fileName)
+        finally:
+            p.terminate()
+            p.join()
+            receiver.close()
+
+    return result
 
+
+def _getMultiprocessingContext(
+        testFilePath: Optional[pathlib.Path]=None
+    ) -> "Union[mp.context.SpawnContext, mp.context.ForkServerContext]":
+    """
+    Get the multiprocessing context for checkpy.context.startMethod, either "spawn" or "forkserver".
+    The forkserver preloads checkpy, its dependencies and any libraries the test file imports.
+    Each tester is then forked from this warm process, without any test or student code imported.
+    Note that the forkserver is started once, the libraries of later test files are not preloaded.
+    Falls back on spawn if forkserver is not available on this platform.
+    """
+    if checkpy.context.startMethod != "forkserver" or "forkserver" not in mp.get_all_start_methods():
+        return mp.get_context("spawn")
+
+    ctx = mp.get_context("forkserver")
+    preload = list(_FORKSERVER_PRELOAD)
+    if testFilePath is not None:
+        preload.extend(m for m in _getLibraryImports(testFilePath) if m not in preload)
+    ctx.set_forkserver_preload(preload)
+    return ctx
+
+
+_FORKSERVER_PRELOAD = [
+    "requests",
+    "dessert",
+    "pytest",
+    "typeguard",
+    "checkpy",
+    "checkpy.lib",
+    "checkpy.tester",
+    "checkpy.tester.pool"
+]
+
+
+_libraryPaths = tuple(
+    str(pathlib.Path(p).resolve()) for p in {sysconfig.get_path(name) for name in ("stdlib", "platstdlib", "purelib", "platlib")}
+)
+
+
+def _isLibraryPath(path: Union[str, pathlib.Path]) -> bool:
+    """Is path part of the standard library or of an installed package?"""
+    return str(pathlib.Path(path).resolve()).startswith(_libraryPaths)
+
+
+def _isLocalPath(path: Union[str, pathlib.Path], directories: Iterable[Union[str, pathlib.Path]]) -> bool:
+    """
+    Is path in one of directories (tests, or a submission), wherever these are? Downloaded tests live in site-packages.
+    Installed packages within these directories (say, of a virtualenv next to the submission) do not count.
+    """
+    resolved = pathlib.Path(path).resolve()
+    for directory in directories:
+        directory = pathlib.Path(directory).resolve()
+        if directory in resolved.parents:
+            return not any(part in ("site-packages", "dist-packages") for part in resolved.relative_to(directory).parts)
+    return False
+
+
+def _getLibraryImports(testFilePath: pathlib.Path) -> List[str]:
+    """Get the names of all modules imported by the test file that come from the standard library or installed packages."""
+    try:
+        tree = ast.parse(testFilePath.read_text())
+    except (OSError, SyntaxError, ValueError):
+        return []
+
+    names: List[str] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.append(node.module)
+
+    libraryImports: List[str] = []
+    for name in names:
+        try:
+            spec = importlib.util.find_spec(name.split(".")[0])
+        except (ImportError, ValueError):
+            continue
+
+        if spec is None or spec.origin is None or spec.origin == "built-in":
+            continue
+
+        # helpers next to the tests are part of the tests, even if the tests are installed in site-packages
+        if _isLibraryPath(spec.origin) and not _isLocalPath(spec.origin, [testFilePath.parent]):
+            if name not in libraryImports:
+                libraryImports.append(name)
+    return libraryImports
+
+
+def _awaitResult(
+        process: mp.process.BaseProcess,
+        receiver: mp.connection.Connection,
+        fileName: Union[str, pathlib.Path]
+    ) -> Tuple["TesterResult", bool]:
+    """
+    Wait for the TesterResult of the tester running in process, while enforcing the timeouts it signals.
+    Blocks until either a message arrives, the process exits or the timeout is reached.
+    Returns the result and whether the timeout (or the hard cpu time limit) was reached. A None message marks a run that ended without result.
+    """
+    start = time.monotonic()
+    isTiming = False
+    timeout = Test.DEFAULT_TIMEOUT
+    description = ""
+
+    while True:
+        deadline = start + timeout if isTiming else None
+        remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+        ready = mp.connection.wait([receiver, process.sentinel], timeout=remaining)
+
+        if receiver in ready:
+            try:
+                message = receiver.recv()
+            except EOFError:
+                return _onExit(process, fileName, description), True
+
+            if message is None:
+                raise exception.CheckpyError(message="An error occured while testing. The testing process exited unexpectedly.")
+
+            if isinstance(message, TesterResult):
+                return message, False
+
+            if message.description is not None:
+                description = message.description
+            if message.isTiming is not None:
+                isTiming = message.isTiming
+            if message.timeout is not None:
+                timeout = message.timeout
+            if message.resetTimer:
+                start = time.monotonic()
+            continue
+
+        if process.sentinel in ready:
+            return _onExit(process, fileName, description), True
+
+        if deadline is not None and time.monotonic() >= deadline:
+            result = TesterResult(pathlib.Path(fileName).name)
+            result.addOutput(printer.displayError("Timeout ({} seconds) reached during: {}".format(timeout, description)))
+            return result, True
+
+
+def _onExit(process: mp.process.BaseProcess, fileName: Union[str, pathlib.Path], description: str) -> "TesterResult":
+    """
+    The result of a tester that exited without sending one. That is only expected if the tested code kept going
+    past the cpu time limit, until the kernel killed it at the hard limit. Any other exit raises a CheckpyError.
+    """
+    # the pipes of the process may close just before it can be waited for
+    process.join(timeout=1)
+    if checkpy.context.cpuLimit is None or process.exitcode not in _CPU_LIMIT_EXITCODES:
+        raise exception.CheckpyError(message="An error occured while testing. The testing process exited unexpectedly.")
+
+    result = TesterResult(pathlib.Path(fileName).name)
+    result.addOutput(printer.displayError(
+        "Cpu time limit ({} seconds) reached during: {}".format(checkpy.context.cpuLimit, description)
+    ))
     return result
 
 
@@ -179,7 +525,8 @@ def runTestsSynchronously(moduleName: str, testPath: pathlib.Path, fileName: str
             testPath=testPath,
             filePath=pathlib.Path(fileName),
             signalQueue=signalQueue,
-            resultQueue=resultQueue
+            resultQueue=resultQueue,
+            setResourceLimits=False
     )
 
     with _addToSysPath(testPath):
@@ -201,6 +548,7 @@ class TesterResult:
         self.nRunTests = 0
         self.output: List[str] = []
         self.testResults: List[TestResult] = []
+        self.timings: Dict[str, Dict[str, float]] = {}
 
     def addOutput(self, output: str):
         self.output.append(output)
@@ -208,7 +556,7 @@ class TesterResult:
     def addResult(self, testResult: TestResult):
         self.testResults.append(testResult)
 
-    def asDict(self) -> Dict[str, Union[str, int, List]]:
+    def asDict(self) -> Dict[str, Union[str, int, List, Dict]]:
         return {
             "name": self.name,
             "nTests": self.nTests,
@@ -216,9 +564,23 @@ class TesterResult:
             "nFailed": self.nFailedTests,
             "nRun": self.nRunTests,
             "output": self.output,
-            "results": [tr.asDict() for tr in self.testResults]
+            "results": [tr.asDict() for tr in self.testResults],
+            "timings": self.timings
         }
 
+    @staticmethod
+    def fromDict(result: Dict[str, Any]) -> "TesterResult":
+        """The inverse of asDict()."""
+        testerResult = TesterResult(result["name"])
+        testerResult.nTests = result["nTests"]
+        testerResult.nPassedTests = result["nPassed"]
+        testerResult.nFailedTests = result["nFailed"]
+        testerResult.nRunTests = result["nRun"]
+        testerResult.output = list(result["output"])
+        testerResult.testResults = [TestResult.fromDict(tr) for tr in result["results"]]
+        testerResult.timings = result.get("timings", {})
+        return testerResult
+
 
 class _Signal:
     def __init__(
@@ -234,6 +596,15 @@ class _Signal:
         self.timeout = timeout
 
 
+class _Sender:
+    """Sends messages over a multiprocessing Connection, through the same put() as a queue."""
+    def __init__(self, connection: mp.connection.Connection):
+        self._connection = connection
+
+    def put(self, message: Union[_Signal, "TesterResult", None]):
+        self._connection.send(message)
+
+
 class _Tester:
     def __init__(
             self, 
@@ -241,18 +612,27 @@ class _Tester:
             testPath: pathlib.Path,
             filePath: pathlib.Path,
             signalQueue: "mp.Queue[_Signal]",
-            resultQueue: "mp.Queue[TesterResult]"
+            resultQueue: "mp.Queue[TesterResult]",
+            setResourceLimits: bool=True
         ):
         self.moduleName = moduleName
         self.testPath = testPath
         self.filePath = filePath.absolute()
         self.signalQueue = signalQueue
         self.resultQueue = resultQueue
+        self.setResourceLimits = setResourceLimits
         self._context = checkpy.context
 
     def run(self):
+        self._startWallTime = time.perf_counter()
+        self._startCpuTime = time.process_time()
+        timing.clearTimings()
+
         checkpy.context = self._context
 
+        if self.setResourceLimits:
+            _setResourceLimits()
+
         warnings.filterwarnings("ignore")
         if checkpy.context.debug:
             warnings.simplefilter('always', DeprecationWarning)
@@ -271,7 +651,8 @@ class _Tester:
 
             with sandbox():
                 try:
-                    module = importlib.import_module(self.moduleName)
+                    with timing.measure("testModule"):
+                        module = importlib.import_module(self.moduleName)
                 except exception.MissingRequiredFiles as e:
                     result = TesterResult(self.filePath.name)
                     result.addOutput(printer.displayError(e))
@@ -332,6 +713,8 @@ class _Tester:
 
         global _activeTest
 
+        regrade = incremental.Regrade.load(self.moduleName, self.testPath, self.filePath) if checkpy.context.incremental else None
+
         # run tests in non-colliding execution order
         for testFunction in self._getTestFunctionsInExecutionOrder(testFunctions):
             test = Test(
@@ -341,7 +724,14 @@ class _Tester:
                 onDescriptionChange=handleDescriptionChange,
                 onTimeoutChange=handleTimeoutChange
             )
-            
+
+            if regrade:
+                isReused, reusedResult = regrade.reuse(testFunction)
+                if isReused:
+                    caches.setCachedTestResult(testFunction, reusedResult)
+                    cachedResults[test] = reusedResult
+                    continue
+
             _activeTest = test
 
             run = testFunction(test)
@@ -353,18 +743,35 @@ class _Tester:
                 timeout=test.timeout
             ))
 
-            with checkpy.lib.io.replaceStdout() as stdout, checkpy.lib.io.replaceStdin() as stdin:
+            with checkpy.lib.io.replaceStdout(limit=checkpy.context.stdoutLimit) as stdout, checkpy.lib.io.replaceStdin() as stdin,\
+                    regrade.track(testFunction) if regrade else contextlib.nullcontext():
                 cachedResults[test] = run()
 
+            if regrade:
+                regrade.record(testFunction, cachedResults[test])
+
             _activeTest = None
 
             self._sendSignal(_Signal(isTiming=False))
 
+        if regrade:
+            regrade.save()
+
         # return test results in specified order
         sortedResults = [cachedResults[test] for test in sorted(cachedResults)]
         return [result for result in sortedResults if result is not None]
     
     def _sendResult(self, result: TesterResult):
+        result.timings = timing.getTimings()
+        result.timings["tester"] = {
+            "wallTime": time.perf_counter() - self._startWallTime,
+            "cpuTime": time.process_time() - self._startCpuTime,
+            "count": 1
+        }
+
+        if checkpy.context.debug:
+            result.addOutput(printer.displayTimings(result.timings, result.testResults))
+
         self.resultQueue.put(result)
 
     def _sendSignal(self, signal: _Signal):
@@ -377,6 +784,63 @@ class _Tester:
             sortedTFs.extend([t for t in dependencies if t not in sortedTFs])
         return sortedTFs
 
+
+# Past the cpu time limit, the kernel kills the tester this many seconds later, in case SIGXCPU does not stop the code
+CPU_LIMIT_GRACE = 2
+
+# How a tester exits once the kernel kills it at the hard cpu time limit
+_CPU_LIMIT_EXITCODES = tuple(-getattr(signal, name) for name in ("SIGKILL", "SIGXCPU") if hasattr(signal, name))
+
+
+def _setResourceLimits():
+    """
+    Limit the memory, cpu time and open files of this (tester) process to those in checkpy.context.
+    Both soft and hard limits are set, such that the tested code cannot lift them again.
+    A process that ran with limits should therefore not be reused for another run.
+    The cpu time limit counts from now on. Once it is exceeded during a test, that test fails with a ResourceLimitError.
+    Does nothing on platforms without the resource module.
+    """
+    try:
+        import resource
+    except ImportError:
+        return
+
+    def setLimit(kind: int, soft: int, hard: int):
+        _, currentHard = resource.getrlimit(kind)
+        if currentHard != resource.RLIM_INFINITY:
+            soft = min(soft, currentHard)
+            hard = min(hard, currentHard)
+        resource.setrlimit(kind, (soft, hard))
+
+    context = checkpy.context
+
+    if context.memoryLimit is not None:
+        memoryLimit = int(context.memoryLimit * 1024 * 1024)
+        setLimit(resource.RLIMIT_AS, memoryLimit, memoryLimit)
+    if context.openFilesLimit is not None:
+        setLimit(resource.RLIMIT_NOFILE, context.openFilesLimit, context.openFilesLimit)
+
+    if context.cpuLimit is None:
+        return
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpuTimeUsed = math.ceil(usage.ru_utime + usage.ru_stime)
+    setLimit(resource.RLIMIT_CPU, cpuTimeUsed + context.cpuLimit, cpuTimeUsed + context.cpuLimit + CPU_LIMIT_GRACE)
+
+    # past the soft limit, the kernel sends SIGXCPU every second
+    def onCpuLimit(signalNumber, frame):
+        if getActiveTest() is None:
+            return
+        raise exception.ResourceLimitError(message=f"used more than {context.cpuLimit} seconds of cpu time, the maximum allowed")
+
+    signal.signal(signal.SIGXCPU, onCpuLimit)
+
+
+def _hasLimits(context: "checkpy._Context") -> bool:
+    """Whether a tester running with this context sets resource limits it cannot lift again."""
+    return context.memoryLimit is not None or context.cpuLimit is not None or context.openFilesLimit is not None
+
+
 @contextlib.contextmanager
 def _addToSysPath(path: str):
     addedToPath = False
@@ -0,0 +1,123 @@
+import contextlib
+import os
+import pathlib
+import time
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from checkpy import printer
+from checkpy.entities import exception
+from checkpy.lib.sandbox import DEFAULT_FILE_LIMIT
+from checkpy.tester import discovery
+from checkpy.tester.pool import TesterPool
+from checkpy.tester.tester import TesterResult, _runTestsCached
+
+
+__all__ = ["watch"]
+
+
+DEFAULT_INTERVAL = 0.5
+
+
+class _Target:
+    """A file to test, with the tests resolved once up front."""
+    def __init__(self, path: pathlib.Path, moduleName: str, testPath: pathlib.Path):
+        self.path = path
+        self.moduleName = moduleName
+        self.testPath = testPath
+        self.previousResult: Optional[TesterResult] = None
+        self.snapshot: Dict[str, Tuple[int, int]] = {}
+
+    def takeSnapshot(self) -> Dict[str, Tuple[int, int]]:
+        """
+        The modification time and size of the file, of everything next to it (that the sandbox may include),
+        and of the test module.
+        """
+        paths = [str(self.testPath / (self.moduleName + ".py"))]
+        for dirPath, dirNames, fileNames in os.walk(self.path.parent):
+            dirNames[:] = [d for d in dirNames if not d.startswith(".") and d != "__pycache__"]
+            paths.extend(os.path.join(dirPath, f) for f in fileNames)
+            if len(paths) > DEFAULT_FILE_LIMIT:
+                break
+
+        snapshot = {}
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+
+def watch(
+        fileNames: Iterable[str],
+        module: str="",
+        testPath: Optional[Union[str, pathlib.Path]]=None,
+        interval: float=DEFAULT_INTERVAL,
+        pool: Optional[TesterPool]=None
+    ) -> Iterator[TesterResult]:
+    """
+    Test each file once, and then again every time it (or a file next to it, or its tests) changes.
+    Changes are found by polling every interval seconds. Tests are looked up once (in testPath if given),
+    and run on a warm tester of a TesterPool. That tester keeps checkpy and the libraries imported,
+    but like any job on the pool each run imports the test module again, as the tests set up checkpy's state on import.
+    After each run, print what tests started or stopped passing.
+    Yields the TesterResult of each run, stops once the generator is closed.
+    """
+    targets = _getTargets(fileNames, module=module, testPath=testPath)
+    if not targets:
+        return
+
+    with contextlib.nullcontext(pool) if pool else TesterPool(size=1) as activePool:
+        while True:
+            for target in targets:
+                if target.takeSnapshot() == target.snapshot:
+                    continue
+
+                try:
+                    result = _runTestsCached(activePool.runTests, target.moduleName, target.testPath, str(target.path), cwd=target.path.parent)
+                except exception.CheckpyError as e:
+                    result = TesterResult(target.path.name)
+                    result.addOutput(printer.displayError(str(e)))
+
+                # after the run, such that files written by the tested code do not trigger another run
+                target.snapshot = target.takeSnapshot()
+
+                if target.previousResult is not None:
+                    result.addOutput(printer.displayChanges(target.previousResult.testResults, result.testResults))
+                target.previousResult = result
+
+                yield result
+
+            time.sleep(interval)
+
+
+def _getTargets(
+        fileNames: Iterable[str],
+        module: str="",
+        testPath: Optional[Union[str, pathlib.Path]]=None
+    ) -> List[_Target]:
+    targets = []
+    for fileName in fileNames:
+        path = discovery.getPath(fileName)
+        if path is None:
+            printer.displayError("File not found: {}".format(fileName))
+            continue
+
+        if path.suffix == ".ipynb":
+            printer.displayError("Jupyter notebooks are not supported in watch mode: {}".format(path))
+            continue
+
+        testFileName = path.stem + "Test.py"
+        if testPath is not None:
+            testPaths = discovery.getTestPathsFrom(testFileName, pathlib.Path(testPath), module=module)
+        else:
+            testPaths = discovery.getTestPaths(testFileName, module=module)
+
+        if not testPaths:
+            printer.displayError("No test found for {}".format(path.name))
+            continue
+
+        targets.append(_Target(path.absolute(), path.stem + "Test", testPaths[0]))
+    return targets
@@ -1,7 +1,10 @@
 import inspect
+import time
 import traceback
 
-from typing import Any, Dict, Set, Tuple, Union, Callable, Iterable, Optional
+from collections import deque
+from functools import wraps
+from typing import Any, Deque, Dict, List, Set, Tuple, Union, Callable, Iterable, Optional
 
 from checkpy import caches
 from checkpy.entities import exception
@@ -63,7 +66,8 @@ class Test:
         self._description = Test.PLACEHOLDER_DESCRIPTION
         self._timeout = Test.DEFAULT_TIMEOUT if timeout is None else timeout
 
-        self._output: list[str] = []
+        from checkpy import context # avoid circular import
+        self._output = _OutputBuffer(context.outputLimit)
 
     def __lt__(self, other):
         return self._priority < other._priority
@@ -120,12 +124,7 @@ class Test:
 
     @property
     def output(self) -> str:
-        from checkpy import context # avoid circular import
-        outputLimit = context.outputLimit
-
-        output = "\n".join(self._output)
-
-        return self._formatOutput(output, outputLimit)
+        return self._output.format()
     
     @staticmethod
     def _formatOutput(text: str, maxChars: int) -> str:
@@ -133,13 +132,20 @@ class Test:
             return text
 
         lines = text.split('\n')
-        # return str(lines)
+        return Test._formatLines(lines, lines, len(lines), maxChars)
+
+    @staticmethod
+    def _formatLines(headLines: List[str], tailLines: List[str], nLines: int, maxChars: int) -> str:
+        """
+        Format output of nLines lines, of which headLines are the first and tailLines the last, to about maxChars characters.
+        headLines and tailLines may be the same lines, or hold just the first and last maxChars + 1 characters (see _OutputBuffer).
+        """
         firstPart = []
         lastPart = []
         
         # Collect the first part of the text
         totalChars = 0
-        for line in lines:
+        for line in headLines:
             # Accept up to maxChars // 2 for first part
             if totalChars + len(line) > maxChars // 2:
                 if all(l == "" or l.isspace() for l in firstPart):
@@ -151,9 +157,9 @@ class Test:
 
             totalChars += len(line) + 1 # +1 for the newline character
 
-        # Collect the last part of the text
+        # Collect the last part of the text, from the lines after the first part
         totalChars = 0
-        for line in reversed(lines[len(firstPart):]):
+        for line in reversed(tailLines[max(0, len(firstPart) - (nLines - len(tailLines))):]):
             # Accept up to maxChars // 2 for first part
             if totalChars + len(line) > maxChars // 2:
                 if all(l == "" or l.isspace() for l in lastPart):
@@ -165,7 +171,7 @@ class Test:
             totalChars += len(line) + 1 # +1 for the newline character
             
         # Combine the parts with the omitted message
-        nLinesOmitted = len(lines) - len(firstPart) - len(lastPart)
+        nLinesOmitted = nLines - len(firstPart) - len(lastPart)
 
         if nLinesOmitted > 0:
             sep = f"<<< {nLinesOmitted} lines omitted >>>"
@@ -176,7 +182,7 @@ class Test:
         return result
 
     def addOutput(self, output: str) -> None:
-        self._output.append(output)
+        self._output.add(output)
 
     def __setattr__(self, __name: str, __value: Any) -> None:
         value = __value
@@ -186,6 +192,64 @@ class Test:
         super().__setattr__(__name, value)
 
 
+class _OutputBuffer:
+    """
+    The output of a test as it comes in, joined by newlines. Keeps only the first and last maxChars + 1 characters,
+    and the number of characters and lines. Formats the same as Test._formatOutput would on all of the output,
+    but in O(maxChars) memory. With a maxChars of 0 (no limit) everything is kept.
+    """
+    def __init__(self, maxChars: int):
+        self.maxChars = maxChars
+        self._size = maxChars + 1
+
+        self._head: List[str] = []
+        self._headSize = 0
+        self._tail: Deque[str] = deque()
+        self._tailSize = 0
+
+        self._nChars = 0
+        self._nNewlines = 0
+        self._isEmpty = True
+
+    def add(self, output: str):
+        if not self._isEmpty:
+            self.write("\n")
+        self._isEmpty = False
+        self.write(output)
+
+    def format(self) -> str:
+        head = "".join(self._head)
+
+        # head and tail overlap (or there is no limit), so together they are all of the output
+        if self.maxChars <= 1 or self._nChars <= 2 * self._size:
+            tail = "".join(self._tail)
+            return Test._formatOutput(head + tail[len(tail) - (self._nChars - len(head)):], self.maxChars)
+
+        tail = "".join(self._tail)[-self._size:]
+        return Test._formatLines(head.split("\n"), tail.split("\n"), self._nNewlines + 1, self.maxChars)
+
+    def write(self, text: str):
+        """Add text as is, without a newline in between (unlike add)."""
+        self._isEmpty = False
+        self._nChars += len(text)
+        self._nNewlines += text.count("\n")
+
+        if self.maxChars <= 1:
+            self._head.append(text)
+            return
+
+        if self._headSize < self._size:
+            headPart = text[:self._size - self._headSize]
+            self._head.append(headPart)
+            self._headSize += len(headPart)
+
+        tailPart = text[-self._size:]
+        self._tail.append(tailPart)
+        self._tailSize += len(tailPart)
+        while self._tailSize - len(self._tail[0]) >= self._size:
+            self._tailSize -= len(self._tail.popleft())
+
+
 class TestResult(object):
     def __init__(
         self,
@@ -201,6 +265,10 @@ class TestResult(object):
         self._exception = exception
         self._output = output
 
+        # Set by the test function after the test has run
+        self.wallTime: Optional[float] = None
+        self.cpuTime: Optional[float] = None
+
     @property
     def description(self):
         return self._description
@@ -221,15 +289,47 @@ class TestResult(object):
     def exception(self):
         return self._exception
 
-    def asDict(self) -> Dict[str, Union[bool, None, str]]:
+    def asDict(self) -> Dict[str, Union[bool, None, str, float]]:
         return {
             "passed": self.hasPassed,
             "description": str(self.description),
             "message": str(self.message),
             "exception": str(self.exception),
-            "output": str(self.output)
+            "output": str(self.output),
+            "wallTime": self.wallTime,
+            "cpuTime": self.cpuTime
         }
 
+    @staticmethod
+    def fromDict(testResult: Dict[str, Any]) -> "TestResult":
+        """The inverse of asDict(), an exception only keeps its message."""
+        result = TestResult(
+            testResult["passed"],
+            testResult["description"],
+            testResult["message"],
+            testResult["output"],
+            exception=None if testResult["exception"] == "None" else Exception(testResult["exception"])
+        )
+        result.wallTime = testResult.get("wallTime")
+        result.cpuTime = testResult.get("cpuTime")
+        return result
+
+
+def _timed(runMethod: Callable[[], Optional[TestResult]]) -> Callable[[], Optional[TestResult]]:
+    """Record the wall and cpu time of runMethod on the TestResult it returns."""
+    @wraps(runMethod)
+    def timedRunMethod() -> Optional[TestResult]:
+        startWallTime = time.perf_counter()
+        startCpuTime = time.process_time()
+
+        result = runMethod()
+
+        if result is not None:
+            result.wallTime = time.perf_counter() - startWallTime
+            result.cpuTime = time.process_time() - startCpuTime
+        return result
+    return timedRunMethod
+
 
 class TestFunction:
     _previousPriority = -1
@@ -251,6 +351,7 @@ class TestFunction:
         self.useDocStringDescription(test)
 
         @caches.cacheTestResult(self)
+        @_timed
         def runMethod():
             with sandbox():
                 try:
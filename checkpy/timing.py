@@ -0,0 +1,42 @@
+import contextlib
+import time
+from typing import Dict, Generator
+
+_timings: Dict[str, Dict[str, float]] = {}
+
+
+@contextlib.contextmanager
+def measure(name: str) -> Generator[None, None, None]:
+    """
+    Measure the wall and cpu time spent in this context, and add it to the timings of name.
+    Nested measurements of the same name are counted for each level.
+    """
+    startWall = time.perf_counter()
+    startCpu = time.process_time()
+    try:
+        yield
+    finally:
+        timing = _getTiming(name)
+        timing["wallTime"] += time.perf_counter() - startWall
+        timing["cpuTime"] += time.process_time() - startCpu
+        timing["count"] += 1
+
+
+def record(name: str, **amounts: float):
+    """Add amounts (for instance bytesCopied=1024) to the timings of name, next to its wall and cpu time."""
+    timing = _getTiming(name)
+    for key, amount in amounts.items():
+        timing[key] = timing.get(key, 0) + amount
+
+
+def getTimings() -> Dict[str, Dict[str, float]]:
+    """Get a copy of all timings measured since the last clear."""
+    return {name: dict(timing) for name, timing in _timings.items()}
+
+
+def clearTimings():
+    _timings.clear()
+
+
+def _getTiming(name: str) -> Dict[str, float]:
+    return _timings.setdefault(name, {"wallTime": 0.0, "cpuTime": 0.0, "count": 0})
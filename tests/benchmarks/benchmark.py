@@ -0,0 +1,371 @@
+"""
+Benchmarks for checkpy's tester pipeline.
+
+Generates synthetic exercises (tiny functions, heavy output, many-file sandboxes,
+long declarative chains and large test modules) and runs each of them through
+runTests (a fresh tester process per run), runTestsSynchronously (in this process)
+and the checkpy CLI. Reports the latency per stage and the throughput, and optionally
+saves everything as json, so that results can be compared across releases. For example:
+
+```
+python tests/benchmarks/benchmark.py --repeat 5 --output before.json
+python tests/benchmarks/benchmark.py --repeat 5 --compare before.json
+```
+"""
+
+import argparse
+import contextlib
+import copy
+import datetime
+import importlib
+import importlib.metadata
+import json
+import os
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from typing import Callable, Dict, Iterator, List, Optional
+
+import checkpy
+import checkpy.caches as caches
+import checkpy.tester as tester
+
+# checkpy.database re-exports a function called database, that shadows the module of the same name
+database = importlib.import_module("checkpy.database.database")
+
+
+class Exercise:
+    def __init__(
+            self,
+            name: str,
+            source: str,
+            testSource: str,
+            files: Optional[Dict[str, str]]=None
+        ):
+        self.name = name
+        self.source = source
+        self.testSource = testSource
+        self.files = files if files else {}
+
+    @property
+    def fileName(self) -> str:
+        return self.name + ".py"
+
+    @property
+    def moduleName(self) -> str:
+        return self.name + "Test"
+
+    def create(self, root: pathlib.Path):
+        """Write the exercise to root/<name>/, with its tests in root/tests/."""
+        directory = root / self.name
+        directory.mkdir()
+        (directory / self.fileName).write_text(self.source)
+        for fileName, content in self.files.items():
+            path = directory / fileName
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+
+        testsDir = root / "tests"
+        testsDir.mkdir(exist_ok=True)
+        (testsDir / (self.moduleName + ".py")).write_text(self.testSource)
+
+
+def tinyExercise() -> Exercise:
+    return Exercise(
+        name="tiny",
+        source="def square(x):\n    return x * x\n",
+        testSource=(
+            "from checkpy import *\n"
+            "\n"
+            "@test()\n"
+            "def testSquare():\n"
+            "    \"\"\"square(3) returns 9\"\"\"\n"
+            "    assert getFunction('square')(3) == 9\n"
+        )
+    )
+
+
+def heavyOutputExercise(nLines: int=100_000) -> Exercise:
+    return Exercise(
+        name="heavyOutput",
+        source="for i in range({}):\n    print('line', i)\n".format(nLines),
+        testSource=(
+            "from checkpy import *\n"
+            "\n"
+            "@test()\n"
+            "def testOutput():\n"
+            "    \"\"\"prints {n} lines\"\"\"\n"
+            "    assert len(outputOf().splitlines()) == {n}\n"
+        ).format(n=nLines)
+    )
+
+
+def manyFilesExercise(nFiles: int=500) -> Exercise:
+    return Exercise(
+        name="manyFiles",
+        source=(
+            "import os\n"
+            "print(sum(len(open(os.path.join('data', f)).read()) for f in os.listdir('data')))\n"
+        ),
+        testSource=(
+            "from checkpy import *\n"
+            "\n"
+            "include('data/*')\n"
+            "\n"
+            "@test()\n"
+            "def testData():\n"
+            "    \"\"\"reads all data files\"\"\"\n"
+            "    assert outputOf() == '{}\\n'\n"
+        ).format(nFiles * 100),
+        files={"data/{}.txt".format(i): "x" * 100 for i in range(nFiles)}
+    )
+
+
+def declarativeChainExercise(nCalls: int=200) -> Exercise:
+    chain = "".join("\n    .call({0}, {1}).returns({2})".format(i, i + 1, 2 * i + 1) for i in range(nCalls))
+    return Exercise(
+        name="declarativeChain",
+        source="def add(a, b):\n    return a + b\n",
+        testSource=(
+            "from checkpy import *\n"
+            "\n"
+            "testAdd = test()(declarative\n"
+            "    .function('add')\n"
+            "    .params('a', 'b')\n"
+            "    .returnType(int)"
+            "{}\n"
+            ")\n"
+        ).format(chain)
+    )
+
+
+def largeModuleExercise(nTests: int=300) -> Exercise:
+    tests = "".join(
+        (
+            "\n"
+            "@test()\n"
+            "def testIncrement{0}():\n"
+            "    \"\"\"increment({0}) returns {1}\"\"\"\n"
+            "    assert getFunction('increment')({0}) == {1}\n"
+        ).format(i, i + 1) for i in range(nTests)
+    )
+    return Exercise(
+        name="largeModule",
+        source="def increment(x):\n    return x + 1\n",
+        testSource="from checkpy import *\n" + tests
+    )
+
+
+EXERCISES: Dict[str, Callable[[], Exercise]] = {
+    "tiny": tinyExercise,
+    "heavyOutput": heavyOutputExercise,
+    "manyFiles": manyFilesExercise,
+    "declarativeChain": declarativeChainExercise,
+    "largeModule": largeModuleExercise,
+}
+
+
+class Run:
+    """The outcome of running one exercise once."""
+    def __init__(self, wallTime: float, nTests: int, nPassedTests: int, stages: Dict[str, float]):
+        self.wallTime = wallTime
+        self.nTests = nTests
+        self.nPassedTests = nPassedTests
+        self.stages = stages
+
+    @staticmethod
+    def fromResult(wallTime: float, result: dict) -> "Run":
+        """Create a Run from the json (TesterResult.asDict()) of the result."""
+        stages = {name: timing["wallTime"] for name, timing in result.get("timings", {}).items()}
+        return Run(wallTime, result["nTests"], result["nPassed"], stages)
+
+
+def runWithRunTests(exercise: Exercise, root: pathlib.Path) -> Run:
+    start = time.perf_counter()
+    result = tester.runTests(exercise.moduleName, root / "tests", str(root / exercise.name / exercise.fileName))
+    wallTime = time.perf_counter() - start
+    return Run.fromResult(wallTime, result.asDict())
+
+
+def runWithRunTestsSynchronously(exercise: Exercise, root: pathlib.Path) -> Run:
+    # a fresh process starts with an empty cache and without the test module imported
+    caches.clearAllCaches()
+    sys.modules.pop(exercise.moduleName, None)
+
+    start = time.perf_counter()
+    result = tester.runTestsSynchronously(exercise.moduleName, root / "tests", str(root / exercise.name / exercise.fileName))
+    wallTime = time.perf_counter() - start
+    return Run.fromResult(wallTime, result.asDict())
+
+
+CLI_SOURCE = \
+"""
+import importlib
+import pathlib
+import sys
+
+if __name__ == "__main__":
+    # use the benchmark's own database, so that the tests need not be registered with the user's checkpy
+    database = importlib.import_module("checkpy.database.database")
+    database._DBPATH = pathlib.Path(sys.argv.pop(1))
+
+    from checkpy.__main__ import main
+    main()
+"""
+
+
+def runWithCli(exercise: Exercise, root: pathlib.Path) -> Run:
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, str(root / "cli.py"), str(root / "db.json"), "--json", exercise.fileName],
+        cwd=root / exercise.name,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    wallTime = time.perf_counter() - start
+
+    return Run.fromResult(wallTime, json.loads(process.stdout)[0])
+
+
+RUNNERS: Dict[str, Callable[[Exercise, pathlib.Path], Run]] = {
+    "runTests": runWithRunTests,
+    "runTestsSynchronously": runWithRunTestsSynchronously,
+    "cli": runWithCli,
+}
+
+
+@contextlib.contextmanager
+def workspace(exercises: List[Exercise]) -> Iterator[pathlib.Path]:
+    """A temporary directory with all exercises, a tests directory and a database for the CLI."""
+    oldCwd = os.getcwd()
+    oldContext = copy.copy(checkpy.context)
+    checkpy.context.silent = True
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        root = pathlib.Path(tempDir)
+        for exercise in exercises:
+            exercise.create(root)
+
+        (root / "cli.py").write_text(CLI_SOURCE)
+
+        oldDbPath = database._DBPATH
+        database._DBPATH = root / "db.json"
+        try:
+            database.addToLocalTable(root / "tests")
+        finally:
+            database._DBPATH = oldDbPath
+
+        try:
+            yield root
+        finally:
+            os.chdir(oldCwd)
+            checkpy.context = oldContext
+
+
+def summarize(exercise: Exercise, runnerName: str, runs: List[Run]) -> dict:
+    wallTimes = [run.wallTime for run in runs]
+    median = statistics.median(wallTimes)
+    stageNames = sorted({name for run in runs for name in run.stages})
+
+    return {
+        "exercise": exercise.name,
+        "runner": runnerName,
+        "nTests": runs[0].nTests,
+        "nPassedTests": runs[0].nPassedTests,
+        "wallTimes": wallTimes,
+        "min": min(wallTimes),
+        "median": median,
+        "mean": statistics.mean(wallTimes),
+        "runsPerSecond": 1 / median if median else None,
+        "testsPerSecond": runs[0].nTests / median if median else None,
+        "stages": {name: statistics.median(run.stages.get(name, 0.0) for run in runs) for name in stageNames}
+    }
+
+
+def benchmark(exerciseNames: List[str], runnerNames: List[str], repeat: int) -> List[dict]:
+    exercises = [EXERCISES[name]() for name in exerciseNames]
+    results = []
+
+    with workspace(exercises) as root:
+        for exercise in exercises:
+            for runnerName in runnerNames:
+                runner = RUNNERS[runnerName]
+                os.chdir(root / exercise.name)
+
+                # warm up (file system caches, compiled bytecode of checkpy itself)
+                runner(exercise, root)
+
+                runs = [runner(exercise, root) for _ in range(repeat)]
+                result = summarize(exercise, runnerName, runs)
+                results.append(result)
+                report(result)
+
+    return results
+
+
+def report(result: dict):
+    stages = ", ".join("{} {:.1f}ms".format(name, time * 1000) for name, time in result["stages"].items())
+    print("{:<18} {:<22} median {:8.1f}ms  min {:8.1f}ms  {:7.1f} tests/s  [{}]".format(
+        result["exercise"],
+        result["runner"],
+        result["median"] * 1000,
+        result["min"] * 1000,
+        result["testsPerSecond"] or 0,
+        stages
+    ))
+
+
+def compare(results: List[dict], previous: dict):
+    previousResults = {(r["exercise"], r["runner"]): r for r in previous["results"]}
+
+    print("\nCompared to checkpy {} ({}):".format(previous["checkpy"], previous["date"]))
+    for result in results:
+        key = (result["exercise"], result["runner"])
+        if key not in previousResults:
+            continue
+        before = previousResults[key]["median"]
+        print("{:<18} {:<22} {:8.1f}ms -> {:8.1f}ms  ({:+.1f}%)".format(
+            result["exercise"],
+            result["runner"],
+            before * 1000,
+            result["median"] * 1000,
+            (result["median"] - before) / before * 100
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmarks for checkpy's tester pipeline")
+    parser.add_argument("--exercises", nargs="+", choices=list(EXERCISES), default=list(EXERCISES), help="exercises to benchmark, all by default")
+    parser.add_argument("--runners", nargs="+", choices=list(RUNNERS), default=list(RUNNERS), help="ways of running the tests to benchmark, all by default")
+    parser.add_argument("--repeat", type=int, default=5, help="number of measured runs per exercise and runner, default is 5")
+    parser.add_argument("--output", help="save the results as json to this file")
+    parser.add_argument("--compare", help="compare the results to those saved earlier in this json file")
+    args = parser.parse_args()
+
+    results = benchmark(args.exercises, args.runners, args.repeat)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "checkpy": importlib.metadata.version("checkpy"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpuCount": os.cpu_count(),
+                "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                "repeat": args.repeat,
+                "results": results
+            }, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import unittest
+import pathlib
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import checkpy.interactive as interactive
+from checkpy.tester.tester import _inWindow
+
+import fixtures
+from fixtures import IntegrationTest
+
+
+TEST_SOURCE = fixtures.TEST_SOURCE + \
+"""
+@test()
+def dataExists():
+    \"\"\"data.txt exists\"\"\"
+    assert os.path.exists("data.txt")
+
+import os
+"""
+
+
+class TestTestBatch(IntegrationTest):
+    def setUp(self):
+        super().setUp()
+        self.write(self.testsDir / "fooTest.py", TEST_SOURCE)
+
+        self.submissionsDir = self.dir / "submissions"
+        for student, source in [("alice", 'print("foo")'), ("bob", 'print("bar")'), ("carol", None)]:
+            (self.submissionsDir / student).mkdir(parents=True)
+            if source is not None:
+                self.write(self.submissionsDir / student / "foo.py", source)
+        self.write(self.submissionsDir / "alice" / "data.txt", "42")
+
+    def test_batch(self):
+        results = dict(interactive.testBatch("foo.py", "submissions/*", testPath=self.testsDir, jobs=2))
+
+        self.assertEqual(
+            sorted(results),
+            [pathlib.Path("submissions") / s for s in ["alice", "bob", "carol"]]
+        )
+
+        alice = results[pathlib.Path("submissions/alice")]
+        self.assertEqual(alice.nPassedTests, 2)
+
+        bob = results[pathlib.Path("submissions/bob")]
+        self.assertEqual(bob.nPassedTests, 0)
+        self.assertEqual(bob.nFailedTests, 2)
+
+        carol = results[pathlib.Path("submissions/carol")]
+        self.assertEqual(carol.nTests, 0)
+        self.assertIn("file not found", carol.output[0].lower())
+
+    def test_noTests(self):
+        self.assertEqual(list(interactive.testBatch("bar.py", "submissions/*", testPath=self.testsDir)), [])
+
+
+class TestInWindow(unittest.TestCase):
+    def test_bounded(self):
+        futures = []
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            def submit(i):
+                futures.append(executor.submit(time.sleep, 0.001))
+                return futures[-1]
+
+            for ordered in [True, False]:
+                futures.clear()
+                yielded = []
+                for i, future in _inWindow(submit, range(100), window=4, ordered=ordered):
+                    self.assertTrue(future.done())
+                    # the running ones, and this one
+                    self.assertLessEqual(len([f for f in futures if not f.done()]), 4 + 1)
+                    if not ordered:
+                        self.assertLessEqual(len(futures) - len(yielded), 4 + 1)
+                    yielded.append(i)
+
+                self.assertEqual(sorted(yielded), list(range(100)))
+                if ordered:
+                    self.assertEqual(yielded, list(range(100)))
+
+    def test_slowFirstDoesNotHoldUpOthers(self):
+        started = {}
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            def run(i):
+                started[i] = time.monotonic()
+                time.sleep(1 if i == 0 else 0.01)
+                return time.monotonic()
+
+            yielded = []
+            for i, future in _inWindow(lambda i: executor.submit(run, i), range(20), window=4):
+                if i == 0:
+                    firstDone = future.result()
+                yielded.append(i)
+
+        self.assertEqual(yielded, list(range(20)))
+        self.assertLess(max(started.values()), firstDone)
+
+    def test_cancelOnClose(self):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            futures = []
+            def submit(i):
+                futures.append(executor.submit(time.sleep, 0.05))
+                return futures[-1]
+
+            window = _inWindow(submit, range(10), window=3)
+            next(window)
+            window.close()
+            self.assertEqual(len(futures), 4)
+            self.assertTrue(futures[-1].cancelled())
+
+
+if __name__ == '__main__':
+    unittest.main()
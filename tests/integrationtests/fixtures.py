@@ -0,0 +1,50 @@
+import unittest
+import os
+import pathlib
+import shutil
+import tempfile
+
+from typing import Any, Dict
+
+import checkpy
+import checkpy.caches as caches
+
+
+# tests for foo.py, most of the integration tests need no more than this
+TEST_SOURCE = \
+"""
+from checkpy import *
+
+@test()
+def printsFoo():
+    \"\"\"prints foo\"\"\"
+    assert outputOf() == "foo\\n"
+"""
+
+
+class IntegrationTest(unittest.TestCase):
+    """
+    Runs each test from a fresh temporary directory self.dir, that has an empty tests directory self.testsDir.
+    During the test checkpy.context is a new context with the settings of context (silent by default).
+    Cleanups run after tearDown, so a subclass can stop whatever still uses the directory there.
+    """
+    context: Dict[str, Any] = {"silent": True}
+
+    def setUp(self):
+        caches.clearAllCaches()
+        self.addCleanup(caches.clearAllCaches)
+
+        self.addCleanup(setattr, checkpy, "context", checkpy.context)
+        checkpy.context = checkpy._Context(**self.context)
+
+        self.dir = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.dir)
+
+        self.testsDir = self.dir / "tests"
+        self.testsDir.mkdir()
+
+    def write(self, path, source):
+        with open(path, "w") as f:
+            f.write(source)
@@ -0,0 +1,170 @@
+import unittest
+import os
+
+import checkpy
+import checkpy.tester as tester
+
+from fixtures import IntegrationTest
+
+
+SOURCE = \
+"""
+def square(x):
+    return x * x
+
+def cube(x):
+    return x * x * x
+
+print("hello")
+"""
+
+TEST_SOURCE = \
+"""
+from checkpy import *
+
+def ran(name):
+    with open({runsPath!r}, "a") as f:
+        f.write(name + "\\n")
+
+@test()
+def testSquare():
+    \"\"\"square(3) returns 9\"\"\"
+    ran("testSquare")
+    assert getFunction("square")(3) == 9
+
+@test()
+def testCube():
+    \"\"\"cube(2) returns 8\"\"\"
+    ran("testCube")
+    assert getFunction("cube")(2) == 8
+
+@test()
+def testNoWhile():
+    \"\"\"does not use while\"\"\"
+    ran("testNoWhile")
+    assert "while" not in static.getSource()
+
+@passed(testSquare, hide=False)
+def testSquareAgain():
+    \"\"\"square(4) returns 16\"\"\"
+    ran("testSquareAgain")
+    assert getFunction("square")(4) == 16
+"""
+
+MAIN_SOURCE = \
+"""
+def main():
+    print("a")
+
+main()
+"""
+
+MAIN_TEST_SOURCE = \
+"""
+import checkpy
+from checkpy import *
+
+@test()
+def testOutput():
+    \"\"\"prints a\"\"\"
+    assert outputOf() == "a\\n"
+
+@test()
+def testOutputAgain():
+    \"\"\"still prints a\"\"\"
+    assert outputOf() == "a\\n"
+
+@test()
+def testReadsFile():
+    \"\"\"mentions a\"\"\"
+    with open(checkpy.file) as f:
+        assert '"a"' in f.read()
+"""
+
+
+class TestIncremental(IntegrationTest):
+    context = {"silent": True, "incremental": True}
+
+    def setUp(self):
+        super().setUp()
+
+        # the tester process stores its records in the result cache
+        self.oldCacheHome = os.environ.get("XDG_CACHE_HOME")
+        os.environ["XDG_CACHE_HOME"] = str(self.dir / "cache")
+
+        self.runsPath = self.dir / "runs.txt"
+        self.write(self.testsDir / "fooTest.py", TEST_SOURCE.format(runsPath=str(self.runsPath)))
+        self.write(self.dir / "foo.py", SOURCE)
+
+    def tearDown(self):
+        if self.oldCacheHome is None:
+            del os.environ["XDG_CACHE_HOME"]
+        else:
+            os.environ["XDG_CACHE_HOME"] = self.oldCacheHome
+
+    def run_foo(self):
+        if self.runsPath.exists():
+            self.runsPath.unlink()
+        result = tester.runTests("fooTest", self.testsDir, str(self.dir / "foo.py"))
+        runs = self.runsPath.read_text().split() if self.runsPath.exists() else []
+        return result, sorted(runs)
+
+    def test_unchanged(self):
+        first, runs = self.run_foo()
+        self.assertEqual(len(runs), 4)
+
+        second, runs = self.run_foo()
+        self.assertEqual(runs, [])
+        self.assertEqual(
+            [tr.asDict() for tr in second.testResults],
+            [tr.asDict() for tr in first.testResults]
+        )
+        self.assertEqual(second.nPassedTests, 4)
+
+    def test_functionChanged(self):
+        self.run_foo()
+        self.write(self.dir / "foo.py", SOURCE.replace("x * x * x", "x ** 3"))
+        result, runs = self.run_foo()
+        self.assertEqual(runs, ["testCube", "testNoWhile"])
+        self.assertEqual(result.nPassedTests, 4)
+
+    def test_dependencyChanged(self):
+        self.run_foo()
+        self.write(self.dir / "foo.py", SOURCE.replace("return x * x\n", "return x + x\n"))
+        result, runs = self.run_foo()
+        self.assertEqual(runs, ["testNoWhile", "testSquare"])
+        self.assertFalse(result.testResults[0].hasPassed)
+        self.assertIsNone(result.testResults[3].hasPassed)
+
+    def test_commentsDoNotMatter(self):
+        self.run_foo()
+        self.write(self.dir / "foo.py", SOURCE.replace("return x * x\n", "return x * x # squared\n"))
+        _, runs = self.run_foo()
+        self.assertEqual(runs, ["testNoWhile"])
+
+    def test_topLevelChanged(self):
+        self.run_foo()
+        self.write(self.dir / "foo.py", SOURCE + "print('world')\n")
+        _, runs = self.run_foo()
+        self.assertEqual(len(runs), 4)
+
+    def test_moduleFromCache(self):
+        self.write(self.testsDir / "mainTest.py", MAIN_TEST_SOURCE)
+        self.write(self.dir / "main.py", MAIN_SOURCE)
+        result = tester.runTests("mainTest", self.testsDir, str(self.dir / "main.py"))
+        self.assertEqual(result.nPassedTests, 3)
+
+        # main() runs once (for the first test), the second test uses the module from the cache
+        self.write(self.dir / "main.py", MAIN_SOURCE.replace('"a"', '"b"'))
+        result = tester.runTests("mainTest", self.testsDir, str(self.dir / "main.py"))
+        self.assertEqual(result.nPassedTests, 0)
+
+    def test_notIncremental(self):
+        self.run_foo()
+        checkpy.context.incremental = False
+        _, runs = self.run_foo()
+        self.assertEqual(len(runs), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+
+import checkpy
+import checkpy.tester as tester
+
+from fixtures import IntegrationTest
+
+
+TEST_SOURCE = \
+"""
+from checkpy import *
+
+@test()
+def first():
+    \"\"\"runs the code\"\"\"
+    outputOf()
+
+@test()
+def second():
+    \"\"\"runs after the first test\"\"\"
+    pass
+"""
+
+
+class TestResourceLimits(IntegrationTest):
+    def setUp(self):
+        super().setUp()
+        self.write(self.testsDir / "fooTest.py", TEST_SOURCE)
+
+    def run_foo(self, source):
+        self.write(self.dir / "foo.py", source)
+        return tester.runTests("fooTest", self.testsDir, str(self.dir / "foo.py"))
+
+    def test_noLimits(self):
+        result = self.run_foo("print('foo' * 1000)")
+        self.assertEqual(result.nPassedTests, 2)
+
+    def test_stdoutLimit(self):
+        checkpy.context.stdoutLimit = 100
+        result = self.run_foo("while True:\n    print('foo')")
+        self.assertFalse(result.testResults[0].hasPassed)
+        self.assertIn("printed more than 100 characters", result.testResults[0].message)
+        self.assertTrue(result.testResults[1].hasPassed)
+
+    def test_memoryLimit(self):
+        checkpy.context.memoryLimit = 1024
+        result = self.run_foo("x = bytearray(2 * 1024 ** 3)")
+        self.assertFalse(result.testResults[0].hasPassed)
+        self.assertIn("MemoryError", result.testResults[0].message)
+        self.assertTrue(result.testResults[1].hasPassed)
+
+    def test_cpuLimit(self):
+        checkpy.context.cpuLimit = 1
+        result = self.run_foo("while True:\n    pass")
+        self.assertFalse(result.testResults[0].hasPassed)
+        self.assertIn("more than 1 seconds of cpu time", result.testResults[0].message)
+        self.assertTrue(result.testResults[1].hasPassed)
+
+    def test_openFilesLimit(self):
+        checkpy.context.openFilesLimit = 64
+        result = self.run_foo("files = [open('foo.py') for _ in range(100)]")
+        self.assertFalse(result.testResults[0].hasPassed)
+        self.assertIn("Too many open files", result.testResults[0].message)
+
+    def test_memoryLimitCannotBeLifted(self):
+        checkpy.context.memoryLimit = 1024
+        result = self.run_foo(
+            "import resource\n"
+            "resource.setrlimit(resource.RLIMIT_AS, (resource.RLIM_INFINITY, resource.RLIM_INFINITY))\n"
+            "x = bytearray(2 * 1024 ** 3)"
+        )
+        self.assertFalse(result.testResults[0].hasPassed)
+
+    def test_cpuLimitCannotBeIgnored(self):
+        checkpy.context.cpuLimit = 1
+        result = self.run_foo("import signal\nsignal.signal(signal.SIGXCPU, signal.SIG_IGN)\nwhile True:\n    pass")
+        self.assertEqual(result.nPassedTests, 0)
+        self.assertIn("Cpu time limit (1 seconds) reached", "".join(result.output))
+
+    def test_poolWorkerWithLimitsIsRecycled(self):
+        with tester.TesterPool(size=1) as pool:
+            self.write(self.dir / "foo.py", "import resource\nresource.setrlimit(resource.RLIMIT_AS, (resource.RLIM_INFINITY, resource.RLIM_INFINITY))")
+            pool.runTests("fooTest", self.testsDir, str(self.dir / "foo.py"))
+            worker = pool._workers[0]
+
+            checkpy.context.memoryLimit = 1024
+            result = pool.runTests("fooTest", self.testsDir, str(self.dir / "foo.py"))
+            self.assertFalse(result.testResults[0].hasPassed)
+
+            checkpy.context.memoryLimit = None
+            result = pool.runTests("fooTest", self.testsDir, str(self.dir / "foo.py"))
+            self.assertTrue(result.testResults[0].hasPassed)
+            self.assertNotIn(worker, pool._workers)
+
+    def test_limitsAreLiftedInPool(self):
+        with tester.TesterPool(size=1) as pool:
+            checkpy.context.openFilesLimit = 64
+            self.write(self.dir / "foo.py", "files = [open('foo.py') for _ in range(100)]")
+            result = pool.runTests("fooTest", self.testsDir, str(self.dir / "foo.py"))
+            self.assertFalse(result.testResults[0].hasPassed)
+
+            checkpy.context.openFilesLimit = None
+            result = pool.runTests("fooTest", self.testsDir, str(self.dir / "foo.py"))
+            self.assertTrue(result.testResults[0].hasPassed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+import unittest
+import pathlib
+import shutil
+import sys
+import sysconfig
+import tempfile
+
+import checkpy
+import checkpy.tester as tester
+import checkpy.entities.exception as exception
+
+from fixtures import IntegrationTest, TEST_SOURCE
+
+TIMEOUT_TEST_SOURCE = \
+"""
+from checkpy import *
+
+@test(timeout=1)
+def hangs():
+    \"\"\"hangs\"\"\"
+    import time
+    time.sleep(60)
+"""
+
+CRASH_TEST_SOURCE = \
+"""
+from checkpy import *
+
+@test()
+def crashes():
+    \"\"\"crashes\"\"\"
+    import os
+    os._exit(1)
+"""
+
+UNPICKLABLE_TEST_SOURCE = \
+"""
+from checkpy import *
+
+@test()
+def raises():
+    \"\"\"raises an exception defined by the student\"\"\"
+    getFunction("f")()
+"""
+
+ONLY_TEST_SOURCE = \
+"""
+from checkpy import *
+
+only("foo.py")
+
+@test()
+def onlyFoo():
+    \"\"\"only foo.py is in the sandbox\"\"\"
+    import os
+    assert not os.path.exists("other.txt")
+"""
+
+STATE_TEST_SOURCE = \
+"""
+from checkpy import *
+
+@test()
+def cleanState():
+    \"\"\"starts from a clean state\"\"\"
+    import os, random, sys
+    isClean = sum([1, 2]) == 3 and "POLLUTED" not in os.environ and sys.getrecursionlimit() != 12345
+    isRandom = random.random() != 0.8444218515250481 # the first number after random.seed(0)
+    getModule()
+    assert isClean and isRandom
+"""
+
+POLLUTING_SOURCE = \
+"""
+import builtins, os, random, sys
+builtins.sum = lambda xs: 0
+os.environ["POLLUTED"] = "1"
+sys.setrecursionlimit(12345)
+random.seed(0)
+"""
+
+
+class TestTesterPool(IntegrationTest):
+    def setUp(self):
+        super().setUp()
+        self.write(self.testsDir / "fooTest.py", TEST_SOURCE)
+        self.write(self.testsDir / "hangTest.py", TIMEOUT_TEST_SOURCE)
+        self.write(self.dir / "foo.py", 'print("foo")')
+        self.write(self.testsDir / "crashTest.py", CRASH_TEST_SOURCE)
+        self.write(self.dir / "hang.py", '')
+        self.write(self.dir / "crash.py", '')
+        self.write(self.testsDir / "unpicklableTest.py", UNPICKLABLE_TEST_SOURCE)
+        self.write(self.dir / "unpicklable.py", 'class MyError(Exception):\n    pass\n\ndef f():\n    raise MyError()\n')
+
+        self.pool = tester.TesterPool(size=1, maxJobsPerWorker=3)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def withoutTimings(self, result):
+        result = result.asDict()
+        del result["timings"]
+        for testResult in result["results"]:
+            del testResult["wallTime"]
+            del testResult["cpuTime"]
+        return result
+
+    def run_foo(self):
+        return self.pool.runTests("fooTest", self.testsDir, str(self.dir / "foo.py"))
+
+    def test_runTests(self):
+        result = self.run_foo()
+        self.assertEqual(result.nTests, 1)
+        self.assertTrue(result.testResults[0].hasPassed)
+
+    def test_sameResultAsRunTests(self):
+        expected = tester.runTests("fooTest", self.testsDir, str(self.dir / "foo.py"))
+        self.assertEqual(self.withoutTimings(self.run_foo()), self.withoutTimings(expected))
+
+    def test_timings(self):
+        result = self.run_foo()
+        self.assertIn("tester", result.timings)
+        self.assertIn("import", result.timings)
+        self.assertIsNotNone(result.testResults[0].wallTime)
+        self.assertIn("timings", result.asDict())
+
+    def test_workerIsReused(self):
+        self.run_foo()
+        worker = self.pool._workers[0]
+        self.run_foo()
+        self.assertEqual(self.pool._workers[0], worker)
+
+    def test_cleanStateBetweenJobs(self):
+        self.run_foo()
+        self.write(self.dir / "foo.py", 'print("bar")')
+        result = self.run_foo()
+        self.assertFalse(result.testResults[0].hasPassed)
+
+    def test_recycleAfterMaxJobs(self):
+        self.run_foo()
+        worker = self.pool._workers[0]
+        self.run_foo()
+        self.run_foo()
+        self.assertNotIn(worker, self.pool._workers)
+        self.assertFalse(worker.isAlive)
+        self.assertTrue(self.run_foo().testResults[0].hasPassed)
+
+    def test_recycleAfterTimeout(self):
+        result = self.pool.runTests("hangTest", self.testsDir, str(self.dir / "hang.py"))
+        self.assertIn("Timeout (1 seconds) reached during: hangs", result.output[-1])
+        self.assertTrue(self.run_foo().testResults[0].hasPassed)
+
+    def test_recycleAfterCrash(self):
+        with self.assertRaises(exception.CheckpyError):
+            self.pool.runTests("crashTest", self.testsDir, str(self.dir / "crash.py"))
+        self.assertTrue(self.run_foo().testResults[0].hasPassed)
+
+    def test_unpicklableResult(self):
+        with self.assertRaises(exception.CheckpyError):
+            self.pool.runTests("unpicklableTest", self.testsDir, str(self.dir / "unpicklable.py"))
+        self.assertTrue(self.run_foo().testResults[0].hasPassed)
+
+    def test_testsInSitePackages(self):
+        # where downloaded tests live after a pip install
+        sitePackagesDir = pathlib.Path(tempfile.mkdtemp(dir=sysconfig.get_path("purelib")))
+        self.addCleanup(shutil.rmtree, sitePackagesDir)
+        self.write(sitePackagesDir / "onlyTest.py", ONLY_TEST_SOURCE)
+        self.write(sitePackagesDir / "helpers.py", "")
+        self.write(self.dir / "other.txt", "")
+
+        for _ in range(2):
+            result = self.pool.runTests("onlyTest", sitePackagesDir, str(self.dir / "foo.py"))
+            self.assertTrue(result.testResults[0].hasPassed)
+
+        self.write(sitePackagesDir / "importsTest.py", "import json\nimport helpers")
+        sys.path.insert(0, str(sitePackagesDir))
+        self.addCleanup(sys.path.remove, str(sitePackagesDir))
+        self.assertEqual(tester.tester._getLibraryImports(sitePackagesDir / "importsTest.py"), ["json"])
+
+    def test_interpreterStateRestored(self):
+        self.write(self.testsDir / "stateTest.py", STATE_TEST_SOURCE)
+        self.write(self.dir / "state.py", POLLUTING_SOURCE)
+        self.assertTrue(self.pool.runTests("stateTest", self.testsDir, str(self.dir / "state.py")).testResults[0].hasPassed)
+
+        self.write(self.dir / "state.py", "")
+        self.assertTrue(self.pool.runTests("stateTest", self.testsDir, str(self.dir / "state.py")).testResults[0].hasPassed)
+
+    def test_recycleAfterStudentThreads(self):
+        self.write(self.dir / "foo.py", 'import threading, time\nthreading.Thread(target=time.sleep, args=(1,)).start()\nprint("foo")')
+        self.run_foo()
+        worker = self.pool._workers[0]
+        self.run_foo()
+        self.assertNotEqual(self.pool._workers[0], worker)
+        self.assertFalse(worker.isAlive)
+
+    def test_runTestsCrash(self):
+        with self.assertRaises(exception.CheckpyError):
+            tester.runTests("crashTest", self.testsDir, str(self.dir / "crash.py"))
+
+    def test_forkserver(self):
+        expected = tester.runTests("fooTest", self.testsDir, str(self.dir / "foo.py"))
+        checkpy.context.startMethod = "forkserver"
+        result = tester.runTests("fooTest", self.testsDir, str(self.dir / "foo.py"))
+        self.assertEqual(self.withoutTimings(result), self.withoutTimings(expected))
+
+        self.write(self.dir / "foo.py", 'print("bar")')
+        result = tester.runTests("fooTest", self.testsDir, str(self.dir / "foo.py"))
+        self.assertFalse(result.testResults[0].hasPassed)
+
+    def test_getLibraryImports(self):
+        self.write(self.testsDir / "importsTest.py", "import json\nimport fooTest\nimport idonotexist")
+        self.assertEqual(
+            tester.tester._getLibraryImports(self.testsDir / "importsTest.py"),
+            ["json"]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+
+import checkpy
+import checkpy.tester as tester
+import checkpy.tester.resultcache as resultcache
+
+from fixtures import IntegrationTest
+
+
+TEST_SOURCE = \
+"""
+from checkpy import *
+
+includeFromTests("data.txt")
+
+# keep track of how often the tests actually run
+with open({runsPath!r}, "a") as f:
+    f.write("x")
+
+@test()
+def printsData():
+    \"\"\"prints the content of data.txt\"\"\"
+    assert outputOf() == open("data.txt").read() + "\\n"
+"""
+
+
+class TestResultCache(IntegrationTest):
+    context = {"silent": True, "cache": True}
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(setattr, resultcache, "_CACHEPATH", resultcache._CACHEPATH)
+        resultcache._CACHEPATH = self.dir / "cache"
+
+        self.runsPath = self.dir / "runs.txt"
+        self.runsPath.touch()
+
+        self.write(self.testsDir / "fooTest.py", TEST_SOURCE.format(runsPath=str(self.runsPath)))
+        self.write(self.testsDir / "data.txt", "foo")
+
+        self.submission = self.dir / "alice"
+        self.submission.mkdir()
+        self.write(self.submission / "foo.py", "print(open('data.txt').read())")
+
+    @property
+    def nRuns(self):
+        return len(self.runsPath.read_text())
+
+    def run_foo(self):
+        [(_, result)] = tester.testSubmissions("foo.py", [self.submission], self.testsDir)
+        return result
+
+    def test_cacheHit(self):
+        first = self.run_foo()
+        second = self.run_foo()
+        self.assertEqual(self.nRuns, 1)
+        self.assertTrue(second.testResults[0].hasPassed)
+        self.assertEqual(second.asDict(), first.asDict())
+
+    def test_noCache(self):
+        checkpy.context.cache = False
+        self.run_foo()
+        self.run_foo()
+        self.assertEqual(self.nRuns, 2)
+        self.assertFalse(resultcache._CACHEPATH.exists())
+
+    def test_submissionChanged(self):
+        self.run_foo()
+        self.write(self.submission / "foo.py", "print('bar')")
+        self.assertFalse(self.run_foo().testResults[0].hasPassed)
+        self.assertEqual(self.nRuns, 2)
+
+    def test_includedFromTestsChanged(self):
+        self.run_foo()
+        self.write(self.testsDir / "data.txt", "bar")
+        self.assertTrue(self.run_foo().testResults[0].hasPassed)
+        self.assertEqual(self.nRuns, 2)
+
+    def test_contextChanged(self):
+        self.run_foo()
+        checkpy.context.stdoutLimit = 100
+        self.run_foo()
+        self.assertEqual(self.nRuns, 2)
+
+    def test_refreshCache(self):
+        self.run_foo()
+        checkpy.context.refreshCache = True
+        self.run_foo()
+        checkpy.context.refreshCache = False
+        self.run_foo()
+        self.assertEqual(self.nRuns, 2)
+
+    def test_prune(self):
+        self.run_foo()
+        self.assertEqual(resultcache.prune(maxAge=60), 0)
+        self.assertEqual(resultcache.prune(), 1)
+        self.run_foo()
+        self.assertEqual(self.nRuns, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
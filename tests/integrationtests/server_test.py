@@ -0,0 +1,163 @@
+import unittest
+import base64
+import http.client
+import io
+import json
+import os
+import socket
+import tarfile
+import threading
+import time
+
+from checkpy.tester.server import GradingServer
+
+from fixtures import IntegrationTest, TEST_SOURCE
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__("localhost")
+        self.socketPath = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX)
+        self.sock.connect(self.socketPath)
+
+
+class TestGradingServer(IntegrationTest):
+    def setUp(self):
+        super().setUp()
+        self.write(self.testsDir / "fooTest.py", TEST_SOURCE)
+
+        self.submission = self.dir / "alice"
+        self.submission.mkdir()
+        self.write(self.submission / "foo.py", 'print("foo")')
+
+        self.server = None
+
+    def tearDown(self):
+        if self.server is not None and self.thread.is_alive():
+            self.server.drain()
+            self.thread.join()
+
+    def serve(self, address, **kwargs):
+        self.server = GradingServer(address, jobs=1, testPath=self.testsDir, **kwargs)
+        self.thread = threading.Thread(target=self.server.serveForever)
+        self.thread.start()
+
+    def connect(self):
+        if ":" in self.server.address:
+            host, port = self.server.address.split(":")
+            return http.client.HTTPConnection(host, int(port))
+        return _UnixConnection(self.server.address)
+
+    def request(self, method, path, body=None):
+        connection = self.connect()
+        try:
+            connection.request(method, path, body=None if body is None else json.dumps(body))
+            response = connection.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            connection.close()
+
+    def test_gradeSubmission(self):
+        self.serve("127.0.0.1:0")
+        status, result = self.request("POST", "/test", {"file": "foo.py", "submission": str(self.submission)})
+        self.assertEqual(status, 200)
+        self.assertEqual(result["nPassed"], 1)
+        self.assertEqual(result["nTests"], 1)
+
+        status, result = self.request("GET", "/status")
+        self.assertEqual(status, 200)
+        self.assertEqual(result, {"jobs": 1, "running": 0, "queued": 0, "completed": 1, "draining": False})
+
+    def test_gradeTarball(self):
+        self.serve(str(self.dir / "checkpy.sock"))
+
+        data = io.BytesIO()
+        with tarfile.open(fileobj=data, mode="w:gz") as tar:
+            tar.add(self.submission / "foo.py", arcname="foo.py")
+        tarball = base64.b64encode(data.getvalue()).decode()
+
+        status, result = self.request("POST", "/test", {"file": "foo.py", "tarball": tarball})
+        self.assertEqual(status, 200)
+        self.assertEqual(result["nPassed"], 1)
+
+    def test_badRequests(self):
+        self.serve("127.0.0.1:0")
+        self.assertEqual(self.request("POST", "/test", {"file": "foo.py"})[0], 400)
+        self.assertEqual(self.request("POST", "/test", {"file": "foo.py", "tarball": "not a tarball"})[0], 400)
+        self.assertEqual(self.request("POST", "/test", {"file": "bar.py", "submission": str(self.submission)})[0], 404)
+        self.assertEqual(self.request("GET", "/foo")[0], 404)
+
+    def test_tarballOutsideOfSubmission(self):
+        self.serve("127.0.0.1:0")
+
+        data = io.BytesIO()
+        with tarfile.open(fileobj=data, mode="w") as tar:
+            tar.add(self.submission / "foo.py", arcname="../foo.py")
+        tarball = base64.b64encode(data.getvalue()).decode()
+
+        status, result = self.request("POST", "/test", {"file": "foo.py", "tarball": tarball})
+        self.assertEqual(status, 400)
+        self.assertIn("outside", result["error"])
+
+    def tarball(self, files):
+        data = io.BytesIO()
+        with tarfile.open(fileobj=data, mode="w:gz") as tar:
+            for name, content in files.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(content)
+                tar.addfile(info, io.BytesIO(content))
+        return base64.b64encode(data.getvalue()).decode()
+
+    def test_bodyTooLarge(self):
+        self.serve("127.0.0.1:0", maxBodySize=1000)
+        tarball = self.tarball({"foo.py": b'print("foo")', "data.txt": os.urandom(2000)})
+        status, result = self.request("POST", "/test", {"file": "foo.py", "tarball": tarball})
+        self.assertEqual(status, 413)
+        self.assertEqual(self.request("GET", "/status")[1]["queued"], 0)
+
+    def test_tarballTooLarge(self):
+        self.serve("127.0.0.1:0", maxExtractedSize=1000)
+        tarball = self.tarball({"foo.py": b'print("foo")', "data.txt": bytes(10 ** 6)})
+        status, result = self.request("POST", "/test", {"file": "foo.py", "tarball": tarball})
+        self.assertEqual(status, 413)
+        self.assertIn("more than 1000 bytes", result["error"])
+
+    def test_tarballTooManyFiles(self):
+        self.serve("127.0.0.1:0", maxMembers=10)
+        tarball = self.tarball({"{}.txt".format(i): b"" for i in range(20)})
+        status, result = self.request("POST", "/test", {"file": "foo.py", "tarball": tarball})
+        self.assertEqual(status, 413)
+        self.assertIn("more than 10 files", result["error"])
+
+    def test_queueFull(self):
+        self.serve("127.0.0.1:0", maxQueued=0)
+        self.write(self.submission / "foo.py", 'import time\ntime.sleep(2)\nprint("foo")')
+
+        slow = threading.Thread(target=self.request, args=("POST", "/test", {"file": "foo.py", "submission": str(self.submission)}))
+        slow.start()
+        self.addCleanup(slow.join)
+        while self.request("GET", "/status")[1]["running"] == 0:
+            time.sleep(0.01)
+
+        status, result = self.request("POST", "/test", {"file": "foo.py", "submission": str(self.submission)})
+        self.assertEqual(status, 503)
+        self.assertEqual(self.request("GET", "/status")[1]["queued"], 0)
+
+    def test_drain(self):
+        socketPath = self.dir / "checkpy.sock"
+        self.serve(str(socketPath))
+
+        status, result = self.request("POST", "/drain")
+        self.assertEqual(status, 202)
+        self.assertTrue(result["draining"])
+
+        self.thread.join(timeout=10)
+        self.assertFalse(self.thread.is_alive())
+        self.assertFalse(os.path.exists(socketPath))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+import checkpy.tester as tester
+
+import fixtures
+from fixtures import IntegrationTest
+
+
+TEST_SOURCE = fixtures.TEST_SOURCE + \
+"""
+@test()
+def writesFile():
+    \"\"\"writes out.txt\"\"\"
+    with open("out.txt", "w") as f:
+        f.write("bar")
+"""
+
+
+class TestWatch(IntegrationTest):
+    def setUp(self):
+        super().setUp()
+        self.write(self.testsDir / "fooTest.py", TEST_SOURCE)
+        self.write(self.dir / "foo.py", 'print("foo")')
+
+        self.watcher = tester.watch(["foo.py"], testPath=self.testsDir, interval=0.01)
+
+    def tearDown(self):
+        self.watcher.close()
+
+    def test_rerunOnChange(self):
+        first = next(self.watcher)
+        self.assertTrue(first.testResults[0].hasPassed)
+
+        self.write(self.dir / "foo.py", 'print("bar")')
+        second = next(self.watcher)
+        self.assertFalse(second.testResults[0].hasPassed)
+        self.assertIn("now failing (was passing): prints foo", second.output[-1])
+
+        self.write(self.dir / "foo.py", 'print("foo") # fixed')
+        third = next(self.watcher)
+        self.assertTrue(third.testResults[0].hasPassed)
+        self.assertIn("now passing (was failing): prints foo", third.output[-1])
+
+    def test_rerunOnNewFile(self):
+        next(self.watcher)
+        self.write(self.dir / "data.txt", "42")
+        self.assertIn("No changes", next(self.watcher).output[-1])
+
+    def test_fileNotFound(self):
+        self.assertEqual(list(tester.watch(["bar.py"], testPath=self.testsDir)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import sys
+
+import checkpy.caches as caches
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+        @caches.cache()
+        def f(*args, **kwargs):
+            self.calls.append((args, kwargs))
+            return len(self.calls)
+        self.f = f
+
+        self.addCleanup(setattr, sys, "argv", list(sys.argv))
+
+    def tearDown(self):
+        caches.clearAllCaches()
+
+    def test_hitsAndMisses(self):
+        self.assertEqual(self.f(1), 1)
+        self.assertEqual(self.f(1), 1)
+        self.assertEqual(self.f(2), 2)
+        self.assertEqual(self.f.cache.hits, 1)
+        self.assertEqual(self.f.cache.misses, 2)
+
+    def test_structuralKeys(self):
+        self.f(["foo", "bar"], overwrite=[("x", {"y": 1})])
+        self.f(["foo", "bar"], overwrite=[("x", {"y": 1})])
+        self.assertEqual(len(self.calls), 1)
+
+        self.f(["foo", "baz"], overwrite=[("x", {"y": 1})])
+        self.assertEqual(len(self.calls), 2)
+
+    def test_typesDiffer(self):
+        self.f([1])
+        self.f([1.0])
+        self.f([True])
+        self.assertEqual(len(self.calls), 3)
+
+    def test_kwargsOrder(self):
+        self.f(a=1, b=2)
+        self.f(b=2, a=1)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_unhashable(self):
+        class Foo:
+            __hash__ = None
+            def __repr__(self):
+                return "Foo()"
+
+        self.f(Foo())
+        self.f(Foo())
+        self.assertEqual(len(self.calls), 1)
+
+    def test_argv(self):
+        self.f()
+        sys.argv = ["foo.py", "bar"]
+        self.f()
+        self.assertEqual(len(self.calls), 2)
+
+    def test_maxSize(self):
+        @caches.cache(maxSize=2)
+        def g(x):
+            self.calls.append(x)
+            return x
+
+        g(1)
+        g(2)
+        g(1)
+        g(3)
+        self.assertEqual(len(g.cache), 2)
+        g(1)
+        self.assertEqual(self.calls, [1, 2, 3])
+        g(2)
+        self.assertEqual(self.calls, [1, 2, 3, 2])
+
+    def test_clear(self):
+        self.f(1)
+        self.f.cache.clear()
+        self.f(1)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.f.cache.stats(), {"hits": 0, "misses": 1, "size": 1, "maxSize": None})
+
+    def test_clearAllCaches(self):
+        self.f(1)
+        caches.clearAllCaches()
+        self.f(1)
+        self.assertEqual(len(self.calls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
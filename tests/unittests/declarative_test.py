@@ -0,0 +1,71 @@
+import unittest
+import os
+import shutil
+import tempfile
+
+import checkpy.caches as caches
+import checkpy.lib as lib
+import checkpy.tester.tester as tester
+from checkpy.lib import declarative
+from checkpy.tests import Test
+
+
+class TestDeclarativeChain(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.tempdir)
+
+        with open("square.py", "w") as f:
+            f.write("def square(x):\n    return x * x\n")
+
+        stdout_context = lib.io.replaceStdout()
+        stdout_context.__enter__()
+        self.addCleanup(stdout_context.__exit__, None, None, None)
+
+        stdin_context = lib.io.replaceStdin()
+        stdin_context.__enter__()
+        self.addCleanup(stdin_context.__exit__, None, None, None)
+
+        tester._activeTest = Test("square.py", 0)
+        self.addCleanup(setattr, tester, "_activeTest", None)
+        self.addCleanup(caches.clearAllCaches)
+
+    def test_sharedSteps(self):
+        square = declarative.function("square", fileName="square.py").params("x")
+        testTwo = square.call(2).returns(4)
+        testThree = square.call(3).returns(9)
+
+        self.assertEqual(len(square._stack), 2)
+        self.assertEqual(len(testTwo._stack), 4)
+        self.assertIs(testTwo._stack._previous._previous, square._stack)
+        self.assertIs(testThree._stack._previous._previous, square._stack)
+        self.assertNotEqual(testTwo.__name__, testThree.__name__)
+
+    def test_run(self):
+        square = declarative.function("square", fileName="square.py").params("x")
+        state = square.call(2).returns(4).call(3).returns(9)()
+        self.assertEqual(state.args, [3])
+        self.assertEqual(state.returned, 9)
+
+        with self.assertRaises(AssertionError):
+            square.call(2).returns(5)()
+
+    def test_runsAreIndependent(self):
+        square = declarative.function("square", fileName="square.py").call(2)
+        first = square()
+        second = square()
+        self.assertIsNot(first.args, second.args)
+        self.assertFalse(square._initialState.wasCalled)
+        self.assertEqual(square._initialState.args, [])
+
+    def test_descriptionFirst(self):
+        square = declarative.function("square", fileName="square.py")
+        described = square.description("squares")
+        self.assertEqual(len(described._stack), 2)
+        self.assertIs(tuple(described._stack)[1], tuple(square._stack)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,10 @@
 import unittest
 from io import StringIO
+import ast
 import os
 import shutil
 import tempfile
+import tokenize
 
 import checkpy.lib as lib
 import checkpy.caches as caches
@@ -13,6 +15,7 @@ class Base(unittest.TestCase):
     def setUp(self):
         self.tempdir = tempfile.mkdtemp()
         self.addCleanup(shutil.rmtree, self.tempdir)
+        self.addCleanup(os.chdir, os.getcwd())
         os.chdir(self.tempdir)
 
         self.fileName = "dummy.py"
@@ -50,6 +53,150 @@ class TestSource(Base):
         self.assertEqual(source, self.source)
 
 
+class TestStaticCache(Base):
+    def setUp(self):
+        super().setUp()
+        caches.clearAllCaches()
+
+    def test_parsedOnce(self):
+        for _ in range(3):
+            lib.getFunctionCalls(lib.getSource(self.fileName))
+            lib.static.getAstNodes(ast.Mult, source=lib.getSource(self.fileName))
+            ast.Mult in lib.static.AbstractSyntaxTree(self.fileName)
+        self.assertEqual(lib.static._treeCache.misses, 1)
+
+    def test_changedFile(self):
+        self.assertEqual(lib.getSource(self.fileName), self.source)
+        self.write("print('changed')")
+        self.assertEqual(lib.getSource(self.fileName), "print('changed')")
+
+    def test_oldFile(self):
+        os.utime(self.fileName, (0, 0))
+        lib.getSource(self.fileName)
+        lib.getSource(self.fileName)
+        self.assertEqual(lib.static._sourceCache.hits, 1)
+
+        self.write("print('changed')")
+        os.utime(self.fileName, (0, 0))
+        self.assertEqual(lib.getSource(self.fileName), "print('changed')")
+
+    def test_clearAllCaches(self):
+        lib.getFunctionDefinitions(lib.getSource(self.fileName))
+        caches.clearAllCaches()
+        self.assertEqual(len(lib.static._treeCache), 0)
+
+
+class TestStaticIndex(Base):
+    def setUp(self):
+        super().setUp()
+        caches.clearAllCaches()
+        self.source = \
+"""import os
+from os import path
+
+def f(x, *args, y=1, **kwargs):
+    return os.path.join(str(x), path.sep)
+
+class C:
+    def g(self):
+        print(f(1 + 2) +
+              3)
+"""
+
+    def test_indexedOnce(self):
+        for _ in range(3):
+            lib.getFunctionCalls(self.source)
+            lib.getFunctionDefinitions(self.source)
+            lib.static.getAstNodes(ast.Add, source=self.source)
+        self.assertEqual(lib.static._indexCache.misses, 1)
+
+    def test_functionCalls(self):
+        self.assertEqual(lib.getFunctionCalls(self.source), ["str", "os.path.join", "f", "print"])
+        self.assertEqual(lib.static._getIndex(self.source).calls[-1], ("print", 9))
+
+    def test_definitions(self):
+        self.assertEqual(lib.getFunctionDefinitions(self.source), ["f", "g"])
+        definitions = lib.static._getIndex(self.source).definitions
+        self.assertEqual([d.name for d in definitions], ["f", "C", "g"])
+        self.assertEqual(definitions[0].params, ["x", "*args", "y", "**kwargs"])
+        self.assertEqual((definitions[1].lineno, definitions[1].endLineno), (7, 10))
+
+    def test_imports(self):
+        self.assertEqual(lib.static._getIndex(self.source).imports, [("os", 1), ("os.path", 2)])
+
+    def test_lineNumbersOfOperators(self):
+        source = "a = 1 + 2\nb = 3 + 4\n"
+        nodes = lib.static.getAstNodes(ast.Add, source=source)
+        self.assertEqual([node.lineno for node in nodes], [1, 2])
+
+    def test_subclassesAndNum(self):
+        self.assertEqual(len(lib.static.getAstNodes(ast.stmt, source=self.source)), 7)
+        self.assertEqual(len(lib.static.getAstNodes(ast.Constant, source=self.source)), 4)
+        self.assertEqual(len(lib.static.getAstNodes(ast.Num, source=self.source)), 4)
+        self.assertEqual(len(lib.static.getAstNodes(ast.Str, source=self.source)), 0)
+
+
+class TestRemoveComments(Base):
+    def setUp(self):
+        super().setUp()
+        caches.clearAllCaches()
+
+    def test_comments(self):
+        source = "# comment\ndef f(x):\n    y = x # comment\n    # comment\n    return y\n"
+        self.assertEqual(lib.removeComments(source), "\ndef f(x):\n    y = x \n    \n    return y\n")
+
+    def test_docstring(self):
+        source = 'def f():\n    """foo\n    bar"""\n'
+        self.assertEqual(lib.removeComments(source), 'def f():\n    """foo     bar"""\n')
+
+    def test_memoized(self):
+        source = "x = 1 # one"
+        self.assertIs(lib.removeComments(source), lib.removeComments(source))
+        self.assertEqual(lib.static._uncommentedCache.misses, 1)
+
+    def test_tokensShared(self):
+        source = "name = 'string' # comment"
+        lib.removeComments(source)
+        tokens = lib.static.getTokens(source)
+        self.assertEqual(lib.static._tokenCache.misses, 1)
+        self.assertEqual([t.string for t in tokens if t.type == tokenize.STRING], ["'string'"])
+
+
+class TestAnalyze(Base):
+    def setUp(self):
+        super().setUp()
+        self.sources = {
+            "loop.py": "for i in range(3):\n    print(i)\n",
+            "while.py": "open('ran.txt', 'w')\nwhile True:\n    break\n",
+            "broken.py": "def f(:\n",
+        }
+        for fileName, source in self.sources.items():
+            with open(fileName, "w") as f:
+                f.write(source)
+        self.queries = {"loops": (ast.For, ast.While), "calls": lib.getFunctionCalls}
+
+    def test_table(self):
+        table = lib.static.analyze(["loop.py", "while.py"], self.queries, jobs=1)
+        self.assertEqual(table, {
+            "loop.py": {"loops": [1], "calls": ["range", "print"]},
+            "while.py": {"loops": [2], "calls": ["open"]},
+        })
+        self.assertFalse(os.path.exists("ran.txt"))
+
+    def test_brokenFile(self):
+        table = lib.static.analyze(["broken.py", "missing.py"], {"loops": ast.For}, jobs=1)
+        self.assertIsInstance(table["broken.py"]["loops"], exception.SourceException)
+        self.assertIsInstance(table["missing.py"]["loops"], exception.SourceException)
+
+    def test_processes(self):
+        fileNames = list(self.sources)
+        self.assertEqual(
+            lib.static.analyze(fileNames, {"loops": (ast.For, ast.While)}, jobs=2)["loop.py"],
+            lib.static.analyze(fileNames, {"loops": (ast.For, ast.While)}, jobs=1)["loop.py"]
+        )
+        self.assertFalse(os.path.exists("ran.txt"))
+
+
 class TestSourceOfDefinitions(Base):
     def test_noDefinitions(self):
         source = \
@@ -218,6 +365,21 @@ print("bar")
         output = lib.outputOf(self.fileName, src = "print(\"foo\")")
         self.assertEqual(output, "foo\n")
 
+    def test_codeIsCompiledOnce(self):
+        source = \
+"""
+print(input())
+"""
+        self.write(source)
+        self.assertEqual(lib.outputOf(self.fileName, stdinArgs = ["foo"]), "foo\n")
+        self.assertEqual(lib.outputOf(self.fileName, stdinArgs = ["bar"]), "bar\n")
+        self.assertEqual(lib.basic._codeCache.misses, 1)
+        self.assertEqual(lib.basic._codeCache.hits, 1)
+
+    def test_changedSourceIsRecompiled(self):
+        self.assertEqual(lib.outputOf(self.fileName, src = "print(\"foo\")"), "foo\n")
+        self.assertEqual(lib.outputOf(self.fileName, src = "print(\"bar\")"), "bar\n")
+
 
 class TestModule(Base):
     def test_function(self):
@@ -288,6 +450,7 @@ class TestDownload(unittest.TestCase):
     def setUp(self):
         self.tempdir = tempfile.mkdtemp()
         self.addCleanup(shutil.rmtree, self.tempdir)
+        self.addCleanup(os.chdir, os.getcwd())
         os.chdir(self.tempdir)
 
     def test_fileDownload(self):
@@ -334,6 +497,42 @@ class TestCaptureStdout(unittest.TestCase):
             sys.stdout = original_stdout
             mock_stdout.close()
 
+    def test_nested(self):
+        with lib.io.replaceStdout():
+            with lib.io.captureStdout() as outer:
+                print("foo")
+                with lib.io.captureStdout() as inner:
+                    for i in range(1000):
+                        print(i)
+                    self.assertEqual(inner.content, "".join(f"{i}\n" for i in range(1000)))
+                print("bar", end="")
+                self.assertEqual(outer.content, "foo\n" + inner.content + "bar")
+                print("baz")
+                self.assertEqual(outer.content, "foo\n" + inner.content + "barbaz\n")
+
+    def test_captureLimit(self):
+        import checkpy
+        oldLimit = checkpy.context.captureLimit
+        checkpy.context.captureLimit = 100
+        try:
+            with lib.io.replaceStdout():
+                with lib.io.captureStdout() as stdout:
+                    for i in range(10000):
+                        print(i)
+                    self.assertEqual(stdout._chunks, [])
+                    self.assertTrue(stdout.content.startswith("0\n1\n"))
+                    self.assertTrue(stdout.content.endswith("9999\n"))
+                    self.assertIn("lines omitted", stdout.content)
+                    self.assertLess(len(stdout.content), 200)
+        finally:
+            checkpy.context.captureLimit = oldLimit
+
+    def test_streamKeepsNothing(self):
+        with lib.io.replaceStdout() as stream:
+            print("foo")
+            self.assertFalse(stream.readable())
+            self.assertFalse(hasattr(stream, "getvalue"))
+
 class TestReplaceStdin(unittest.TestCase):
     def test_noInput(self):
         with lib.io.replaceStdin() as stdin:
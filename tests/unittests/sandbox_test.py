@@ -0,0 +1,137 @@
+import unittest
+import os
+import pathlib
+import shutil
+import stat
+import tempfile
+
+from checkpy import timing
+import checkpy.lib.sandbox as sandboxModule
+from checkpy.lib.sandbox import sandbox, include, exclude
+
+
+class TestSandboxPopulation(unittest.TestCase):
+    def setUp(self):
+        self.oldCwd = os.getcwd()
+        # next to the sandboxes, such that reflinks are possible
+        self.dir = pathlib.Path(tempfile.mkdtemp())
+        os.chdir(self.dir)
+
+        with open("data.txt", "w") as f:
+            f.write("42" * 1000)
+        with open("foo.py", "w") as f:
+            f.write("print('foo')")
+
+        timing.clearTimings()
+
+    def tearDown(self):
+        os.chdir(self.oldCwd)
+        (self.dir / "data.txt").chmod(stat.S_IRUSR | stat.S_IWUSR)
+        shutil.rmtree(self.dir)
+        timing.clearTimings()
+
+    def test_copy(self):
+        with sandbox():
+            include("data.txt")
+            with open("data.txt", "w") as f:
+                f.write("changed")
+
+        with open(self.dir / "data.txt") as f:
+            self.assertEqual(f.read(), "42" * 1000)
+
+        sandboxTimings = timing.getTimings()["sandbox"]
+        self.assertEqual(sandboxTimings.get("bytesCopied", 0) + sandboxTimings.get("bytesCloned", 0), 2000 + 12)
+
+    def test_exclude(self):
+        with sandbox():
+            exclude("data.txt")
+            self.assertTrue(os.path.exists("foo.py"))
+            self.assertFalse(os.path.exists("data.txt"))
+
+        self.assertTrue((self.dir / "data.txt").exists())
+
+    def test_readOnlyOwnFileIsCopied(self):
+        # the owner could chmod a hardlink and change the original through it
+        (self.dir / "data.txt").chmod(stat.S_IRUSR)
+
+        with sandbox():
+            include("data.txt")
+            self.assertNotEqual(os.stat("data.txt").st_ino, os.stat(self.dir / "data.txt").st_ino)
+            os.chmod("data.txt", stat.S_IRUSR | stat.S_IWUSR)
+            with open("data.txt", "w") as f:
+                f.write("changed")
+
+        self.assertEqual((self.dir / "data.txt").read_text(), "42" * 1000)
+
+
+class TestSandboxClone(unittest.TestCase):
+    def setUp(self):
+        self.oldCwd = os.getcwd()
+        self.dir = pathlib.Path(tempfile.mkdtemp())
+        os.chdir(self.dir)
+
+        (self.dir / "data").mkdir()
+        for i in range(10):
+            (self.dir / "data" / f"{i}.txt").write_text(str(i) * 100)
+        (self.dir / "foo.py").write_text("print('foo')")
+
+        timing.clearTimings()
+
+    def tearDown(self):
+        os.chdir(self.oldCwd)
+        shutil.rmtree(self.dir)
+        timing.clearTimings()
+
+    def bytesPopulated(self):
+        sandboxTimings = timing.getTimings().get("sandbox", {})
+        return sandboxTimings.get("bytesCopied", 0) + sandboxTimings.get("bytesCloned", 0)
+
+    def test_reuse(self):
+        with sandbox():
+            include("data/*")
+            moduleSandbox = pathlib.Path.cwd()
+
+            with sandbox():
+                exclude("foo.py")
+                firstDir = pathlib.Path.cwd()
+                pathlib.Path("data/0.txt").write_text("changed")
+                pathlib.Path("new.txt").write_text("new")
+                os.remove("data/1.txt")
+
+            populated = self.bytesPopulated()
+
+            with sandbox():
+                exclude("foo.py")
+                self.assertEqual(pathlib.Path.cwd(), firstDir)
+                self.assertEqual(pathlib.Path("data/0.txt").read_text(), "0" * 100)
+                self.assertEqual(pathlib.Path("data/1.txt").read_text(), "1" * 100)
+                self.assertFalse(os.path.exists("new.txt"))
+                self.assertFalse(os.path.exists("foo.py"))
+
+            # only the two files the first test changed are populated again
+            self.assertEqual(self.bytesPopulated() - populated, 200)
+
+            # changes to the module's sandbox show up in the sandbox of the next test
+            (moduleSandbox / "data" / "2.txt").write_text("two")
+            with sandbox():
+                include("foo.py")
+                self.assertEqual(pathlib.Path("data/2.txt").read_text(), "two")
+                self.assertTrue(os.path.exists("foo.py"))
+
+        self.assertFalse(firstDir.exists())
+        self.assertEqual(sandboxModule._clones, {})
+
+    def test_nestedInUse(self):
+        with sandbox():
+            include("foo.py")
+            with sandbox():
+                exclude("data")
+                outerTestDir = pathlib.Path.cwd()
+                with sandbox():
+                    include("foo.py")
+                    self.assertNotEqual(pathlib.Path.cwd(), outerTestDir)
+                    self.assertTrue(os.path.exists("foo.py"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import random
+
+from checkpy.tests import Test, _OutputBuffer
+
+
+class TestOutputBuffer(unittest.TestCase):
+    def format(self, outputs, maxChars):
+        buffer = _OutputBuffer(maxChars)
+        for output in outputs:
+            buffer.add(output)
+        return buffer.format()
+
+    def test_empty(self):
+        self.assertEqual(self.format([], 10), "")
+        self.assertEqual(self.format([""], 10), "")
+
+    def test_short(self):
+        self.assertEqual(self.format(["foo", "bar\n"], 100), "foo\nbar\n")
+
+    def test_noLimit(self):
+        output = "\n".join(str(i) for i in range(1000))
+        self.assertEqual(self.format([output], 0), output)
+
+    def test_linesOmitted(self):
+        outputs = [f"line {i}" for i in range(100_000)]
+        formatted = self.format(outputs, 100)
+        self.assertIn("<<< 99989 lines omitted >>>", formatted)
+        self.assertTrue(formatted.startswith("line 0\nline 1\n"))
+        self.assertTrue(formatted.endswith("line 99998\nline 99999"))
+
+    def test_longLines(self):
+        outputs = ["a" * 1000 + "\n" + "b" * 1000]
+        self.assertEqual(self.format(outputs, 100), Test._formatOutput("\n".join(outputs), 100))
+
+    def test_sameAsFormatOutput(self):
+        rng = random.Random(0)
+        alphabet = ["a", " ", "\n", "\n\n", "xyz"]
+        for _ in range(2000):
+            maxChars = rng.choice([0, 1, 2, 5, 20, 100])
+            outputs = [
+                "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 200)))
+                for _ in range(rng.randint(0, 5))
+            ]
+            self.assertEqual(self.format(outputs, maxChars), Test._formatOutput("\n".join(outputs), maxChars))
+
+    def test_boundedMemory(self):
+        buffer = _OutputBuffer(100)
+        for i in range(10_000):
+            buffer.add("x" * 50)
+        self.assertLessEqual(sum(len(part) for part in buffer._head), 101)
+        self.assertLessEqual(sum(len(part) for part in buffer._tail), 202)
+
+
+if __name__ == '__main__':
+    unittest.main()